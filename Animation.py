@@ -0,0 +1,11 @@
+class Animation:
+    """
+    ensemble de frames partagé par toutes les tiles animées qui ont les mêmes images aux mêmes dimensions
+    contient aussi l'indice de frame commun utilisé par Map.render() quand les animations sont automatiques (set_animation_auto())
+    classe utilisée par Tile et Map, elle ne doit pas être utilisée directement
+    """
+    def __init__(self, chemins:tuple, frames:list):
+        self.chemins = chemins  # chemins triés des images de l'animation (sert à retrouver le réglage de l'animation dans Map)
+        self.frames = frames    # images de l'animation, ne doit pas être modifiée
+        self.frame = 0  # indice de la frame commune, calculé au plus une fois par render()
+        self.temps = None   # temps (en ms) pour lequel frame a été calculée
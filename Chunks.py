@@ -0,0 +1,176 @@
+import pygame
+from collections import OrderedDict
+
+class Chunks:
+    """
+    couche statique de la map (tiles non animées et visibles) découpée en chunks : des surfaces carrées de taille fixe
+    un chunk n'est créé que s'il contient au moins une tile statique, et seulement quand il arrive près de la caméra
+    les chunks les moins récemment utilisés sont supprimés quand la mémoire utilisée dépasse le budget (ils seront recréés si besoin)
+    quand une tile change, seule la zone modifiée des chunks déjà créés est redessinée (voir marquer() et maj())
+    classe utilisée par Map, elle ne doit pas être utilisée directement
+    """
+    def __init__(self, grille, taille_chunk=512, budget=128*1024*1024):
+        assert type(taille_chunk) == int and taille_chunk > 0, "taille_chunk doit être un entier positif"
+        self.grille = grille    # index spatial des tiles basiques, utilisé pour trouver les tiles d'un chunk
+        self.taille_chunk = taille_chunk
+        self.budget = budget    # mémoire maximale des chunks en octets
+        self.surfaces = OrderedDict()   # (chunk_x, chunk_y) -> Surface, du moins récemment utilisé au plus récemment utilisé
+        self.vides = set()  # chunks sans tile statique (aucune surface n'est créée pour eux)
+        self.octets = 0     # mémoire utilisée par les surfaces des chunks
+        self.sales = {}     # (chunk_x, chunk_y) -> [x1, y1, x2, y2] zone à redessiner du chunk (coordonnées de base)
+        self.masques = OrderedDict()    # (chunk_x, chunk_y) -> masque de collision des tiles statiques du chunk (None si vide), du moins récemment utilisé au plus récemment utilisé
+        self.nb_masques_max = 1024  # nombre maximal de masques gardés (un masque de 512x512 fait 32 Ko)
+
+    def vider(self):
+        """
+        supprime tous les chunks, ils seront recréés lors des prochains render()
+        """
+        self.surfaces = OrderedDict()
+        self.vides = set()
+        self.octets = 0
+        self.sales = {}
+        self.masques = OrderedDict()
+
+    def marquer(self, x1, y1, x2, y2):
+        """
+        indique que la zone (x1, y1, x2, y2) en coordonnées de base a changé (x2 et y2 exclus)
+        les chunks déjà créés qui la touchent seront redessinés sur cette zone seulement lors du prochain maj()
+        """
+        if x2 <= x1 or y2 <= y1 or (len(self.surfaces) == 0 and len(self.vides) == 0 and len(self.masques) == 0):
+            return  # rien à redessiner (pendant un chargement de map par exemple)
+        taille = self.taille_chunk
+        for chunk_x in range(x1 // taille, (x2 - 1) // taille + 1):
+            for chunk_y in range(y1 // taille, (y2 - 1) // taille + 1):
+                chunk = (chunk_x, chunk_y)
+                self.vides.discard(chunk)   # le chunk contient peut-être une tile maintenant
+                self.masques.pop(chunk, None)   # le masque sera recalculé lors de la prochaine demande
+                if chunk in self.surfaces:
+                    zone = self.sales.get(chunk)
+                    if zone == None:
+                        self.sales[chunk] = [x1, y1, x2, y2]
+                    else:
+                        # la zone à redessiner est le rectangle qui englobe les deux zones
+                        self.sales[chunk] = [min(zone[0], x1), min(zone[1], y1), max(zone[2], x2), max(zone[3], y2)]
+
+    def maj(self):
+        """
+        redessine les zones marquées des chunks : la zone est effacée puis les tiles statiques qui la touchent sont reblitées
+        """
+        taille = self.taille_chunk
+        for chunk, zone in self.sales.items():
+            surface = self.surfaces.get(chunk)
+            if surface == None:
+                continue    # chunk supprimé entre temps, il sera recréé en entier
+            chunk_x = chunk[0] * taille
+            chunk_y = chunk[1] * taille
+            x1 = max(zone[0], chunk_x)
+            y1 = max(zone[1], chunk_y)
+            x2 = min(zone[2], chunk_x + taille)
+            y2 = min(zone[3], chunk_y + taille)
+            zone_chunk = pygame.rect.Rect(x1 - chunk_x, y1 - chunk_y, x2 - x1, y2 - y1)
+            surface.fill((0, 0, 0, 0), zone_chunk)
+            surface.set_clip(zone_chunk)
+            for tile in self.grille.chercher(x1, y1, x2, y2):
+                if not tile.get_animated() and tile.get_visible():
+                    surface.blit(tile.image, (tile.x_base - chunk_x, tile.y_base - chunk_y))
+            surface.set_clip(None)
+        self.sales = {}
+
+    def set_budget(self, budget:int):
+        assert type(budget) == int and budget >= 0, "le budget doit être un entier positif (en octets)"
+        self.budget = budget
+        self.__liberer()
+
+    def __liberer(self, garder=None):
+        """
+        supprime les chunks les moins récemment utilisés tant que le budget est dépassé
+        le chunk garder n'est jamais supprimé
+        """
+        while self.octets > self.budget and len(self.surfaces) > 0:
+            chunk, surface = next(iter(self.surfaces.items()))
+            if chunk == garder:
+                if len(self.surfaces) == 1:
+                    break
+                self.surfaces.move_to_end(chunk)
+                continue
+            del self.surfaces[chunk]
+            self.sales.pop(chunk, None)
+            self.octets = self.octets - surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    def __creer(self, chunk):
+        """
+        crée la surface du chunk en blitant les tiles statiques qui le touchent, retourne None si le chunk est vide
+        """
+        taille = self.taille_chunk
+        x = chunk[0] * taille
+        y = chunk[1] * taille
+        tiles = [tile for tile in self.grille.chercher(x, y, x + taille, y + taille) if not tile.get_animated() and tile.get_visible()]
+        if len(tiles) == 0:
+            self.vides.add(chunk)
+            return None
+        surface = pygame.surface.Surface((taille, taille), pygame.SRCALPHA)    # SRCALPHA pour la transparence
+        for tile in tiles:
+            surface.blit(tile.image, (tile.x_base - x, tile.y_base - y))
+        self.surfaces[chunk] = surface
+        self.octets = self.octets + taille * taille * surface.get_bytesize()
+        self.__liberer(chunk)
+        return surface
+
+    def get_chunk(self, chunk):
+        """
+        retourne la surface du chunk (la crée si besoin), ou None si le chunk ne contient aucune tile statique
+        """
+        surface = self.surfaces.get(chunk)
+        if surface != None:
+            self.surfaces.move_to_end(chunk)
+            return surface
+        if chunk in self.vides:
+            return None
+        return self.__creer(chunk)
+
+    def render(self, screen, x1, y1, x2, y2, marge=1, position=(0, 0)):
+        """
+        blit sur screen les chunks qui touchent la zone (x1, y1, x2, y2) en coordonnées de base, (x1, y1) correspondant à position sur screen
+        les chunks dans une bordure de marge chunks autour de la zone sont créés à l'avance (sans être blités)
+        retourne le nombre de chunks blités
+        """
+        taille = self.taille_chunk
+        debut_x = x1 // taille
+        debut_y = y1 // taille
+        fin_x = (x2 - 1) // taille
+        fin_y = (y2 - 1) // taille
+        nb_blits = 0
+        for chunk_x in range(debut_x - marge, fin_x + marge + 1):
+            for chunk_y in range(debut_y - marge, fin_y + marge + 1):
+                surface = self.get_chunk((chunk_x, chunk_y))
+                if surface != None and debut_x <= chunk_x <= fin_x and debut_y <= chunk_y <= fin_y:
+                    # seule la partie du chunk dans la zone est blitée
+                    gauche = max(x1 - chunk_x * taille, 0)
+                    haut = max(y1 - chunk_y * taille, 0)
+                    droite = min(x2 - chunk_x * taille, taille)
+                    bas = min(y2 - chunk_y * taille, taille)
+                    screen.blit(surface, (chunk_x * taille + gauche - x1 + position[0], chunk_y * taille + haut - y1 + position[1]), (gauche, haut, droite - gauche, bas - haut))
+                    nb_blits = nb_blits + 1
+        return nb_blits
+
+    def get_masque(self, chunk):
+        """
+        retourne le masque de collision du chunk : les masques des tiles statiques visibles du chunk réunis en un seul masque de taille taille_chunk
+        retourne None si le chunk ne contient aucune tile statique
+        """
+        if chunk in self.masques:
+            self.masques.move_to_end(chunk)
+            return self.masques[chunk]
+        taille = self.taille_chunk
+        x = chunk[0] * taille
+        y = chunk[1] * taille
+        masque = None
+        for tile in self.grille.chercher(x, y, x + taille, y + taille):
+            if not tile.get_animated() and tile.get_visible():
+                if masque == None:
+                    masque = pygame.mask.Mask((taille, taille))
+                masque.draw(tile.get_masque(), (tile.x_base - x, tile.y_base - y))
+        self.masques[chunk] = masque
+        while len(self.masques) > self.nb_masques_max:
+            self.masques.popitem(last=False)
+        return masque
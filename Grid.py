@@ -0,0 +1,236 @@
+from array import array
+import pygame
+
+class Grid:
+    """
+    index spatial de la map : une grille uniforme de cases carrées (en coordonnées de base, sans la caméra)
+    chaque tile est rangée dans toutes les cases que son image touche, ce qui permet de retrouver les tiles d'une zone
+    sans parcourir toute la map (le coût dépend du nombre de tiles dans la zone, pas de la taille de la map)
+    l'ordre d'affichage (premier plan / dernier plan) est conservé grâce à un numéro d'ordre par tile
+    les ordres et les bornes des tiles sont rangés en colonnes (array d'entiers), chaque tile ayant un indice dans ces colonnes
+    classe utilisée par Map, elle ne doit pas être utilisée directement
+    """
+    def __init__(self, taille_case=256):
+        assert type(taille_case) == int and taille_case > 0, "taille_case doit être un entier positif"
+        self.taille_case = taille_case
+        self.cases = {}     # (case_x, case_y) -> dict tile -> indice de la tile dans les colonnes (dict utilisé comme un set ordonné)
+        self.indices = {}   # tile -> indice de la tile dans les colonnes
+        # colonnes (une valeur par indice) : ordre et bornes utilisées pour le rangement, les indices des tiles retirées sont réutilisés
+        self.ordres = array("q")
+        self.x1 = array("i")
+        self.y1 = array("i")
+        self.x2 = array("i")
+        self.y2 = array("i")
+        self.libres = []    # indices libres dans les colonnes
+        self.rects_cases = {}   # (case_x, case_y) -> (liste des tiles, liste des Rect de leurs bornes), créé par chercher_rects() et supprimé quand la case change
+        self.ordre_min = 0  # ordre de la tile la plus au dernier plan
+        self.ordre_max = 0  # ordre de la tile la plus au premier plan
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __contains__(self, tile):
+        return tile in self.indices
+
+    def get_bornes(self, tile) -> tuple:
+        """
+        retourne les bornes (x1, y1, x2, y2) de la tile, x2 et y2 exclus
+        si la tile est animée, la taille est celle de la plus grande frame
+        """
+        largeur = tile.image.get_width()
+        hauteur = tile.image.get_height()
+        if tile.animated:
+            for frame in tile.liste_frames:
+                if frame.get_width() > largeur:
+                    largeur = frame.get_width()
+                if frame.get_height() > hauteur:
+                    hauteur = frame.get_height()
+        return (tile.x_base, tile.y_base, tile.x_base + largeur, tile.y_base + hauteur)
+
+    def __iter_cases(self, x1, y1, x2, y2):
+        """
+        parcourt les coordonnées des cases touchées par le rectangle (x2 et y2 exclus)
+        """
+        taille = self.taille_case
+        for case_x in range(x1 // taille, (x2 - 1) // taille + 1):
+            for case_y in range(y1 // taille, (y2 - 1) // taille + 1):
+                yield (case_x, case_y)
+
+    def get_bornes_rangees(self, tile) -> tuple:
+        """
+        retourne les bornes (x1, y1, x2, y2) avec lesquelles la tile est rangée dans la grille (celles du dernier ajouter() ou deplacer())
+        """
+        indice = self.indices[tile]
+        return (self.x1[indice], self.y1[indice], self.x2[indice], self.y2[indice])
+
+    def __ranger(self, tile, indice):
+        for case in self.__iter_cases(self.x1[indice], self.y1[indice], self.x2[indice], self.y2[indice]):
+            if not case in self.cases:
+                self.cases[case] = {}
+            self.cases[case][tile] = indice
+            self.rects_cases.pop(case, None)
+
+    def __deranger(self, tile, indice):
+        for case in self.__iter_cases(self.x1[indice], self.y1[indice], self.x2[indice], self.y2[indice]):
+            contenu = self.cases.get(case)
+            if contenu != None:
+                contenu.pop(tile, None)
+                if len(contenu) == 0:
+                    del self.cases[case]
+            self.rects_cases.pop(case, None)
+
+    def ajouter(self, tile, fin=True):
+        """
+        range la tile dans la grille
+        si fin = True, la tile est au premier plan, sinon elle est au dernier plan (même logique que Map.__add_tile)
+        """
+        if tile in self.indices:
+            self.retirer(tile)
+        if len(self.indices) == 0:
+            ordre = 0
+            self.ordre_min = 0
+            self.ordre_max = 0
+        elif fin:
+            self.ordre_max = self.ordre_max + 1
+            ordre = self.ordre_max
+        else:
+            self.ordre_min = self.ordre_min - 1
+            ordre = self.ordre_min
+        x1, y1, x2, y2 = self.get_bornes(tile)
+        if len(self.libres) > 0:
+            indice = self.libres.pop()
+            self.ordres[indice] = ordre
+            self.x1[indice] = x1
+            self.y1[indice] = y1
+            self.x2[indice] = x2
+            self.y2[indice] = y2
+        else:
+            indice = len(self.ordres)
+            self.ordres.append(ordre)
+            self.x1.append(x1)
+            self.y1.append(y1)
+            self.x2.append(x2)
+            self.y2.append(y2)
+        self.indices[tile] = indice
+        self.__ranger(tile, indice)
+
+    def retirer(self, tile):
+        """
+        enlève la tile de la grille (ne fait rien si elle n'y est pas)
+        """
+        indice = self.indices.pop(tile, None)
+        if indice == None:
+            return
+        self.__deranger(tile, indice)
+        self.libres.append(indice)
+
+    def deplacer(self, tile):
+        """
+        met à jour le rangement de la tile après un changement de position ou de taille, sans changer son ordre
+        """
+        indice = self.indices.get(tile)
+        if indice == None:
+            return
+        x1, y1, x2, y2 = self.get_bornes(tile)
+        if (x1, y1, x2, y2) == (self.x1[indice], self.y1[indice], self.x2[indice], self.y2[indice]):
+            return
+        self.__deranger(tile, indice)
+        self.x1[indice] = x1
+        self.y1[indice] = y1
+        self.x2[indice] = x2
+        self.y2[indice] = y2
+        self.__ranger(tile, indice)
+
+    def vider(self):
+        self.cases = {}
+        self.indices = {}
+        self.ordres = array("q")
+        self.x1 = array("i")
+        self.y1 = array("i")
+        self.x2 = array("i")
+        self.y2 = array("i")
+        self.libres = []
+        self.rects_cases = {}
+        self.ordre_min = 0
+        self.ordre_max = 0
+
+    def chercher(self, x1, y1, x2, y2) -> list:
+        """
+        retourne les tiles dont les bornes touchent le rectangle (x1, y1, x2, y2), x2 et y2 exclus
+        les tiles sont triées du dernier plan vers le premier plan (même ordre que dans Map.map)
+        """
+        if x2 <= x1 or y2 <= y1:
+            return []
+        resultat = {}
+        ordres = self.ordres
+        colonne_x1 = self.x1
+        colonne_y1 = self.y1
+        colonne_x2 = self.x2
+        colonne_y2 = self.y2
+        taille = self.taille_case
+        nb_cases = ((x2 - 1) // taille - x1 // taille + 1) * ((y2 - 1) // taille - y1 // taille + 1)
+        if nb_cases > len(self.cases):
+            # zone plus grande que la partie occupée de la grille : plus rapide de parcourir les cases existantes
+            contenus = [contenu for case, contenu in self.cases.items()
+                        if x1 // taille <= case[0] <= (x2 - 1) // taille and y1 // taille <= case[1] <= (y2 - 1) // taille]
+        else:
+            contenus = [self.cases.get(case) for case in self.__iter_cases(x1, y1, x2, y2)]
+        for contenu in contenus:
+            if contenu != None:
+                for tile, indice in contenu.items():
+                    if not tile in resultat:
+                        if colonne_x1[indice] < x2 and colonne_x2[indice] > x1 and colonne_y1[indice] < y2 and colonne_y2[indice] > y1:
+                            resultat[tile] = ordres[indice]
+        return sorted(resultat, key=resultat.__getitem__)
+
+    def __get_rects_case(self, case) -> tuple:
+        """
+        retourne (liste des tiles, liste des Rect de leurs bornes) de la case, gardés jusqu'à ce que la case change
+        la case doit exister (les cases vides ne sont pas gardées, sinon rects_cases grandirait avec chaque case traversée)
+        """
+        rects_case = self.rects_cases.get(case)
+        if rects_case == None:
+            tiles = []
+            rects = []
+            for tile, indice in self.cases[case].items():
+                tiles.append(tile)
+                rects.append(pygame.rect.Rect(self.x1[indice], self.y1[indice], self.x2[indice] - self.x1[indice], self.y2[indice] - self.y1[indice]))
+            rects_case = (tiles, rects)
+            self.rects_cases[case] = rects_case
+        return rects_case
+
+    def chercher_rects(self, rects) -> list:
+        """
+        broadphase : pour chaque rect (pygame.Rect en coordonnées de base), cherche les tiles dont les bornes le touchent
+        chaque rect n'est testé qu'avec les tiles des cases qu'il touche, en un seul collidelistall() par case
+        retourne la liste des paires (indice du rect dans rects, tile)
+        """
+        taille = self.taille_case
+        paires = []
+        for indice, rect in enumerate(rects):
+            if rect.width <= 0 or rect.height <= 0:
+                continue
+            debut_x = rect.left // taille
+            debut_y = rect.top // taille
+            fin_x = (rect.right - 1) // taille
+            fin_y = (rect.bottom - 1) // taille
+            if debut_x == fin_x and debut_y == fin_y:
+                # cas le plus courant : le rect est dans une seule case, pas de doublon possible
+                if not (debut_x, debut_y) in self.cases:
+                    continue
+                tiles, rects_case = self.__get_rects_case((debut_x, debut_y))
+                for i in rect.collidelistall(rects_case):
+                    paires.append((indice, tiles[i]))
+                continue
+            trouvees = set()
+            for case_x in range(debut_x, fin_x + 1):
+                for case_y in range(debut_y, fin_y + 1):
+                    if not (case_x, case_y) in self.cases:
+                        continue
+                    tiles, rects_case = self.__get_rects_case((case_x, case_y))
+                    for i in rect.collidelistall(rects_case):
+                        tile = tiles[i]
+                        if not tile in trouvees:
+                            trouvees.add(tile)
+                            paires.append((indice, tile))
+        return paires
@@ -0,0 +1,97 @@
+import sys
+from collections import OrderedDict
+
+class ImageCache:
+    """
+    cache des images chargées par les tiles (images de base et images mises à l'échelle)
+    la mémoire utilisée est limitée par un budget en octets : quand il est dépassé, les images les moins récemment utilisées sont supprimées
+    une image encore utilisée ailleurs que dans le cache (par une tile par exemple) n'est jamais supprimée, car la supprimer ne libèrerait pas de mémoire
+    utilisation :
+        - cache.get_stats() pour avoir le nombre de succès, d'échecs, de suppressions, d'images et d'octets utilisés
+        - cache.set_budget() pour définir la mémoire maximale en octets
+        - cache.clear() pour vider entièrement le cache
+        - cache.decharger() pour supprimer toutes les images qui ne sont plus utilisées (appelée par Map.charger_map() lors d'un changement de niveau)
+    """
+    def __init__(self, budget=256*1024*1024):
+        self.budget = budget    # mémoire maximale en octets
+        self.surfaces = OrderedDict()   # clé -> Surface, de la moins récemment utilisée à la plus récemment utilisée
+        self.octets = 0
+        self.succes = 0     # nombre de get() qui ont trouvé l'image
+        self.echecs = 0     # nombre de get() qui n'ont pas trouvé l'image
+        self.suppressions = 0   # nombre d'images supprimées à cause du budget
+
+    def __len__(self):
+        return len(self.surfaces)
+
+    def __contains__(self, cle):
+        return cle in self.surfaces
+
+    def __taille(self, surface) -> int:
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    def __est_utilisee(self, cle) -> bool:
+        """
+        détermine si l'image est encore référencée ailleurs que dans le cache
+        2 références : celle du cache et celle passée à getrefcount
+        """
+        return sys.getrefcount(self.surfaces[cle]) > 2
+
+    def get(self, cle):
+        """
+        retourne l'image de la clé, ou None si elle n'est pas dans le cache
+        """
+        surface = self.surfaces.get(cle)
+        if surface == None:
+            self.echecs = self.echecs + 1
+            return None
+        self.succes = self.succes + 1
+        self.surfaces.move_to_end(cle)
+        return surface
+
+    def ajouter(self, cle, surface):
+        """
+        met l'image dans le cache, puis supprime les images les moins récemment utilisées si le budget est dépassé
+        """
+        if cle in self.surfaces:
+            self.octets = self.octets - self.__taille(self.surfaces.pop(cle))
+        self.surfaces[cle] = surface
+        self.octets = self.octets + self.__taille(surface)
+        self.__liberer(cle)
+
+    def __liberer(self, garder=None):
+        """
+        supprime les images non utilisées les moins récemment utilisées tant que le budget est dépassé
+        l'image de la clé garder n'est jamais supprimée
+        """
+        a_verifier = len(self.surfaces)
+        while self.octets > self.budget and a_verifier > 0:
+            a_verifier = a_verifier - 1
+            cle = next(iter(self.surfaces))
+            if cle == garder or self.__est_utilisee(cle):
+                self.surfaces.move_to_end(cle)
+            else:
+                self.octets = self.octets - self.__taille(self.surfaces.pop(cle))
+                self.suppressions = self.suppressions + 1
+
+    def set_budget(self, budget:int):
+        assert type(budget) == int and budget >= 0, "le budget doit être un entier positif (en octets)"
+        self.budget = budget
+        self.__liberer()
+
+    def clear(self):
+        """
+        vide entièrement le cache (les images encore utilisées par des tiles restent valides, mais ne seront plus partagées)
+        """
+        self.surfaces = OrderedDict()
+        self.octets = 0
+
+    def decharger(self):
+        """
+        supprime toutes les images qui ne sont plus utilisées (par exemple les images de l'ancien niveau après un changement de niveau)
+        """
+        for cle in list(self.surfaces):
+            if not self.__est_utilisee(cle):
+                self.octets = self.octets - self.__taille(self.surfaces.pop(cle))
+
+    def get_stats(self) -> dict:
+        return {"succes": self.succes, "echecs": self.echecs, "suppressions": self.suppressions, "images": len(self.surfaces), "octets": self.octets}
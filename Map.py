@@ -1,12 +1,28 @@
 import pygame
 import os
-from Tile import Tile
+import tempfile
+from Tile import Tile, cache_image, precharger_images
+from Grid import Grid
+from Chunks import Chunks
+import SaveBinaire
 import sys
+import math
+import time
+from RenderStats import RenderStats
+
+LIMITE_ZONES = 256  # nombre maximal de zones modifiées retenues pour le rendu partiel, au delà tout est redessiné
+# umask du processus, lu une seule fois (os.umask() le change le temps de la lecture, ce qui toucherait les fichiers créés par d'autres threads)
+UMASK = os.umask(0)
+os.umask(UMASK)
+
 class Map:
     """
     inclus un logiciel de création de map, et des commandes utiles pour l'utilisation de la map dans un jeu
     utilisation lors de la création de jeu :
         - map.charger_map() pour charger le fichier de sauvegarde de la map (le dossier de tiles utilisé doit être présent avec le même chemin)
+          le fichier peut être au format txt (celui du mapmaker) ou au format binaire (voir SaveBinaire), le format est détecté automatiquement
+          une fonction de progression peut être passée en paramètre (elle reçoit le nombre de tiles chargées)
+        - map.convertir_save() pour convertir une save txt en save binaire (plus petite et plus rapide à charger)
         - map.set_dimensions() pour définir les dimensions d'affichage de la map (pour l'optimisation)
           les dimensions ne modifient en aucun cas les dimensions des tiles, elles sont seulement utilisées pour éviter d'afficher l'intégralité des tiles de la map à chaque fois (optimisation)
           la largeur et la hauteur partent du (0,0), c'est à dire que le rectangle créé grâce aux dimensions se situera en haut à gauche de l'écran
@@ -14,12 +30,27 @@ class Map:
         - map.set_camera_pos() pour définir l'emplacement de la caméra (agit comme un sprite, c'est-à-dire qu'il va vers la droite quand x augmente, et vers le bas quand y augmente)
         - map.get_camera_pos()
         - map.render() pour blit la map selon l'emplacement de la caméra
-        - map.maj_map_image() à exécuter si une tile non animée a changé d'emplacement ou de visibilité
-          si cette méthode n'est pas exécutée, le visuel ne changera pas (pas d'incidence sur les rects)
+        - map.set_animation_auto() pour que render() fasse avancer les animations des tiles dans le champs selon le temps
+        - map.set_animation() pour régler la durée des frames et le mode (boucle ou aller-retour) de toutes les animations ou de l'animation d'une tile
+        - map.maj_map_image() à exécuter si une tile non animée a changé d'emplacement ou de visibilité sans passer par Tile.set_visible() ou Tile.set_co_base()
+          (par exemple en modifiant directement ses attributs), si cette méthode n'est pas exécutée, le visuel ne changera pas (pas d'incidence sur les rects)
+          avec Tile.set_visible() et Tile.set_co_base(), seule la zone modifiée est redessinée lors du prochain render()
+        - map.set_rendu_partiel() pour que render() ne redessine que les zones qui ont changé (render() retourne les rects de screen modifiés)
+        - map.set_defilement() pour que render() garde la couche statique du champs et la décale quand la caméra bouge (seules les bandes découvertes sont recomposées)
+        - map.set_stats() pour mesurer chaque render() (compteurs et temps) et maj_map_image(), map.get_stats() pour les obtenir
+        - map.set_budget_chunks() pour définir la mémoire maximale (en octets) utilisée par les chunks de la couche statique de la map
         - tous les get_truc_on_screen pour obtenir les tiles qu'on voit sur l'écran (se met à jour lors de l'utilisation de map.render())
         - tous les get_all_truc pour obtenir toutes les tiles
         - tous les get précédemment cités renvoient des listes de Tile (voir le fichier concerné pour voir ce qu'il est possible de faire)
         - map.is_on_screen(), qui permet de savoir si la tile est dans le champs de la caméra
+        - map.filter_on_screen(), qui retourne parmi les tiles passées en paramètre celles qui sont dans le champs de la caméra
+        - map.query_rect(), map.query_point() et map.query_radius() pour obtenir les tiles qui touchent un rect, un point ou un cercle (coordonnées de base ou de l'écran)
+        - map.collisions() pour obtenir en un seul appel les tiles qui touchent une liste de rects (broadphase)
+        - map.overlap_masque() et map.query_masque() pour les collisions au pixel près avec un masque (pygame.mask), map.set_masques_chunks() et map.precalculer_masques()
+        - map.get_tiles_by_id(), map.get_nb_tiles_id() et map.get_ids() pour obtenir les tiles d'un id, leur nombre, ou le nombre de tiles de chaque id
+        - map.ajouter_acteur(), map.retirer_acteur(), map.set_callbacks_events() et map.maj_events() pour savoir quand un acteur entre, reste ou sort d'un event_point
+        - map.set_visible_id() pour rendre visibles ou invisibles toutes les tiles qui ont un id
+        - map.decaler_zone() pour déplacer toutes les tiles d'une zone
         - map.update_rect_pos(), qui permet de décaler la position du rect passé en paramètre après un render() pour donner l'illusion que celui-ci n'a pas bougé
           ATTENTION : cette méthode ne doit être utilisé qu'une seule fois par sprite par render (si utilisé plusieurs fois, le décalage se fera plusieurs fois)
         les autres méthodes ne sont pas à utiliser
@@ -36,8 +67,26 @@ class Map:
         self.event_points_on_screen = [] # pareil mais pour les event_points
         self.invisible_tiles = []    # ensemble des tiles invisibles (sans les spawn et events)
         self.is_map_maker = False # définit si les spawn et events doivent être affichés
-        self.surface_map = None   # contient la surface qui est blitée sur le screen lors du render
-        self.decalage_negatif = (0, 0)  # décalage qui permet de prendre en compte des tiles avec des coordonnées négatives pour surface_map
+        self.grilles = {"basique": Grid(), "spawn": Grid(), "event": Grid()}  # index spatial de chaque liste, mis à jour par __add_tile et __remove_tile
+        self.__ids = {"basique": {}, "spawn": {}, "event": {}}  # index des ids de chaque liste : id -> dict des tiles qui ont cet id (dict utilisé comme un set ordonné)
+        self.chunks = Chunks(self.grilles["basique"])   # couche statique de la map (tiles non animées) découpée en chunks, blitée sur le screen lors du render
+        self.__champs = None    # (x1, y1, x2, y2) du champs de la caméra en coordonnées de base, mis à jour avec la caméra et les dimensions
+        self.__animation_auto = False   # si True, render() change les frames des tiles animées selon le temps
+        self.__animation_defaut = (100, "boucle")   # (durée d'une frame en ms, mode) des animations sans réglage
+        self.__animations = {}  # tuple des chemins de l'animation -> (durée d'une frame en ms, mode)
+        self.__rendu_partiel = False    # si True, render() ne redessine que les zones modifiées quand c'est possible
+        self.__dernier_rendu = None     # (screen, taille de screen, caméra, dimensions, background) du render() précédent
+        self.__zones_modifiees = []     # (x1, y1, x2, y2) en coordonnées de base des tiles modifiées depuis le render() précédent
+        self.__tout_redessiner = True   # si True, le prochain render() redessine tout (trop de zones modifiées, map rechargée, etc.)
+        self.__images_affichees = {}    # tile animée -> image blitée lors du render() précédent
+        self.__defilement = False   # si True, la couche statique du champs est gardée entre les render() et décalée selon la caméra
+        self.__couche_statique = None   # Surface de la taille du champs : background + chunks, utilisée par le mode défilement
+        self.__couche_infos = None  # (camera_x, camera_y, background) de la couche statique
+        self.__masques_chunks = False   # si True, overlap_masque() utilise les masques des chunks pour les tiles statiques
+        self.__acteurs = {}     # acteur -> [ecran, dict des event_points dans lesquels est l'acteur], voir ajouter_acteur()
+        self.__callbacks_events = (None, None, None)    # fonctions appelées par maj_events() : (entrée, dedans, sortie)
+        self.__stats = None     # RenderStats si les statistiques sont activées, None sinon (aucune mesure)
+        self.__callback_stats = None    # fonction appelée avec les RenderStats à la fin de chaque render()
 
         if type(dimensions) == tuple:
             self.largeur = dimensions[0]
@@ -45,6 +94,7 @@ class Map:
         else:
             self.largeur = None  # largeur de l'affichage, utilisé pour l'optimisation
             self.hauteur = None  # pareil, mais pour la hauteur
+        self.__maj_champs()
 
         # à sauvegarder
         self.chemin_dossier = ""    # dossier qui mène aux png des tiles
@@ -58,6 +108,7 @@ class Map:
         assert type(pos[0]) == int and type(pos[1]) == int, "les éléments de pos doivent être des entiers"
         self.__camera_x = pos[0]
         self.__camera_y = pos[1]
+        self.__maj_champs()
 
     def get_camera_pos(self):
         return (self.__camera_x, self.__camera_y)
@@ -66,9 +117,127 @@ class Map:
         assert type(dimensions) == tuple, "dimensions doit être un tuple"
         self.largeur = dimensions[0]
         self.hauteur = dimensions[1]
+        self.__maj_champs()
     def get_dimensions(self):
         return (self.largeur, self.hauteur)
 
+    def set_animation_auto(self, animation_auto:bool):
+        """
+        si True, render() fait avancer les animations des tiles dans le champs selon le temps écoulé (plus besoin de next_frame())
+        toutes les tiles qui ont la même animation sont synchronisées
+        une tile hors du champs n'est pas mise à jour, elle reprend directement à la bonne frame quand elle revient dans le champs
+        """
+        assert type(animation_auto) == bool, "animation_auto doit être un booléen"
+        self.__animation_auto = animation_auto
+
+    def set_animation(self, duree_frame:int, mode="boucle", tile=None):
+        """
+        règle la durée d'une frame (en ms) et le mode ("boucle" ou "aller-retour") des animations jouées par render() avec set_animation_auto()
+        si une tile animée est passée en paramètre, le réglage s'applique à toutes les tiles qui ont la même animation qu'elle
+        sinon, le réglage s'applique aux animations qui n'ont pas de réglage
+        """
+        assert type(duree_frame) == int and duree_frame > 0, "duree_frame doit être un entier positif"
+        assert mode == "boucle" or mode == "aller-retour", "mode invalide"
+        if tile == None:
+            self.__animation_defaut = (duree_frame, mode)
+        else:
+            assert tile.get_animated(), "cette tile n'est pas animée"
+            self.__animations[tuple(tile.chemin_image)] = (duree_frame, mode)
+
+    def __get_frame_animation(self, animation, temps:int) -> int:
+        """
+        retourne l'indice de la frame de l'animation (partagée par plusieurs tiles) au temps passé en paramètre (en ms)
+        l'indice n'est calculé qu'une seule fois par temps pour toutes les tiles qui ont cette animation
+        """
+        if animation.temps == temps:
+            return animation.frame
+        duree_frame, mode = self.__animations.get(animation.chemins, self.__animation_defaut)
+        nb_frames = len(animation.frames)
+        etape = temps // duree_frame
+        if mode == "aller-retour" and nb_frames > 1:
+            # 0, 1, ..., n-1, n-2, ..., 1, 0, 1, ...
+            periode = 2 * nb_frames - 2
+            etape = etape % periode
+            if etape >= nb_frames:
+                etape = periode - etape
+        else:
+            etape = etape % nb_frames
+        animation.frame = etape
+        animation.temps = temps
+        return etape
+
+    def set_rendu_partiel(self, rendu_partiel:bool):
+        """
+        si True, render() ne redessine que les zones qui ont changé depuis le render() précédent (tiles modifiées, frames des tiles animées)
+        quand la caméra, les dimensions, le background et le screen n'ont pas changé, le reste du screen n'est pas touché
+        """
+        assert type(rendu_partiel) == bool, "rendu_partiel doit être un booléen"
+        self.__rendu_partiel = rendu_partiel
+        self.__tout_redessiner = True
+
+    def set_defilement(self, defilement:bool):
+        """
+        si True, la couche statique du champs (background + tiles non animées) est gardée entre les render()
+        quand la caméra bouge, elle est décalée sur place (Surface.scroll) et seules les bandes découvertes sont recomposées
+        les tiles animées sont toujours blitées par dessus
+        ne fonctionne qu'avec un background (si le background est "none", render() fonctionne normalement)
+        """
+        assert type(defilement) == bool, "defilement doit être un booléen"
+        self.__defilement = defilement
+        self.__couche_statique = None
+        self.__tout_redessiner = True
+
+    def __noter_zone(self, zone:tuple):
+        """
+        retient la zone (x1, y1, x2, y2) en coordonnées de base pour qu'elle soit redessinée lors du prochain render() (rendu partiel)
+        au delà de LIMITE_ZONES zones, tout sera redessiné (plus rapide, et évite de garder une liste énorme pendant un chargement)
+        """
+        if not (self.__rendu_partiel or self.__defilement) or self.__tout_redessiner:
+            return
+        if len(self.__zones_modifiees) >= LIMITE_ZONES:
+            self.__tout_redessiner = True
+            self.__zones_modifiees = []
+        else:
+            self.__zones_modifiees.append(zone)
+
+    def set_stats(self, actif:bool, callback=None):
+        """
+        active ou désactive les statistiques : compteurs et temps de chaque render() (tiles testées, écartées, blits, temps du fill,
+        de la couche statique, du tri, etc.), ainsi que le nombre et le temps total des maj_map_image()
+        si callback est une fonction, elle est appelée avec les statistiques (RenderStats) à la fin de chaque render()
+        désactivées par défaut (render() ne fait alors aucune mesure)
+        """
+        assert type(actif) == bool, "actif doit être un booléen"
+        if actif:
+            if self.__stats == None:
+                self.__stats = RenderStats()
+            self.__callback_stats = callback
+        else:
+            self.__stats = None
+            self.__callback_stats = None
+
+    def get_stats(self):
+        """
+        retourne les statistiques (RenderStats, voir get_dict()) du dernier render(), ou None si elles ne sont pas activées
+        """
+        return self.__stats
+
+    def set_budget_chunks(self, budget:int):
+        """
+        définit la mémoire maximale (en octets) utilisée par les chunks de la couche statique de la map
+        quand le budget est dépassé, les chunks les moins récemment affichés sont supprimés (ils seront recréés s'ils reviennent dans le champs)
+        """
+        self.chunks.set_budget(budget)
+
+    def __maj_champs(self):
+        """
+        met à jour le rectangle du champs de la caméra utilisé par is_on_screen()
+        """
+        if self.largeur == None or self.hauteur == None:
+            self.__champs = None
+        else:
+            self.__champs = (self.__camera_x, self.__camera_y, self.__camera_x + self.largeur, self.__camera_y + self.hauteur)
+
     def get_tiles_on_screen(self):
         """
         retourne une liste contenant toutes les tiles (sauf spawn et event) affichés à l'écran (ce qui signifie qu'ils sont dans le champs)
@@ -115,11 +284,39 @@ class Map:
         """
         retourne toutes les tiles qui ne sont pas affichées (qui ont leur attribut self.visible à False)
         ne prend pas en compte les event_points et les spawn_points
-        la liste retournée est celle de la dernière fois où la méthode render() a été appelée
-        (en gros ça veut dire que pour mettre à jour la liste retournée, il faut appeller render())
+        la liste est calculée lors de l'appel (render() ne parcourt plus toute la map)
         """
+        self.invisible_tiles = [tile for tile in self.map if not tile.get_visible()]
         return list(self.invisible_tiles)
 
+    def set_visible_id(self, id:str, visible:bool) -> int:
+        """
+        rend visibles ou invisibles toutes les tiles (sauf spawn et event) qui ont l'id passé en paramètre
+        seules les zones des tiles modifiées sont redessinées lors du prochain render()
+        retourne le nombre de tiles modifiées
+        """
+        assert type(visible) == bool, "visible doit être un booléen"
+        tiles = self.get_tiles_by_id(id, "basique", not visible)
+        for tile in tiles:
+            tile.set_visible(visible)
+        return len(tiles)
+
+    def decaler_zone(self, zone:tuple, decalage:tuple, type_tile="basique") -> int:
+        """
+        déplace de decalage (dx, dy) toutes les tiles dont les coordonnées de base sont dans la zone (x1, y1, x2, y2), x2 et y2 exclus
+        le type est soit basique, soit spawn, soit event
+        les tiles sont trouvées avec l'index spatial (sans parcourir toute la map), et seules les zones modifiées sont redessinées lors du prochain render()
+        retourne le nombre de tiles déplacées
+        """
+        assert type(zone) == tuple and len(zone) == 4, "zone doit être un tuple (x1, y1, x2, y2)"
+        assert type(decalage) == tuple and len(decalage) == 2, "decalage doit être un tuple (dx, dy)"
+        assert type_tile == "basique" or type_tile == "spawn" or type_tile == "event", "type_tile invalide"
+        x1, y1, x2, y2 = zone
+        tiles = [tile for tile in self.grilles[type_tile].chercher(x1, y1, x2, y2) if x1 <= tile.x_base < x2 and y1 <= tile.y_base < y2]
+        for tile in tiles:
+            tile.set_co_base((tile.x_base + decalage[0], tile.y_base + decalage[1]))
+        return len(tiles)
+
     def __add_tile(self, tile:Tile, type_tile:str, fin=True):
         """
         ajoute un tile à la fin de self.map (premier plan)
@@ -141,6 +338,16 @@ class Map:
             liste_a_modifier.append(tile)
         else:
             liste_a_modifier.insert(0, tile)
+        self.grilles[type_tile].ajouter(tile, fin)
+        tile.proprietaire = self
+        tiles_id = self.__ids[type_tile].get(tile.id)
+        if tiles_id == None:
+            tiles_id = {}
+            self.__ids[type_tile][tile.id] = tiles_id
+        tiles_id[tile] = None
+        self.__noter_zone(self.grilles[type_tile].get_bornes_rangees(tile))
+        if type_tile == "basique" and not tile.get_animated():
+            self.chunks.marquer(*self.grilles["basique"].get_bornes(tile))
 
     def __remove_tile(self, tile:Tile, type_tile:str):
         """
@@ -161,6 +368,107 @@ class Map:
             print("problème avec le type")
         if tile in liste_a_modifier:
             liste_a_modifier.remove(tile)
+            tile.proprietaire = None
+            self.__retirer_id(tile, tile.id, type_tile)
+        if tile in self.grilles[type_tile]:
+            self.__noter_zone(self.grilles[type_tile].get_bornes_rangees(tile))
+            if type_tile == "basique" and not tile.get_animated():
+                self.chunks.marquer(*self.grilles["basique"].get_bornes_rangees(tile))
+        self.grilles[type_tile].retirer(tile)
+
+    def __retirer_id(self, tile:Tile, id, type_tile:str) -> bool:
+        """
+        enlève la tile de l'index des ids, retourne False si elle n'y était pas avec cet id
+        """
+        tiles_id = self.__ids[type_tile].get(id)
+        if tiles_id == None or not tile in tiles_id:
+            return False
+        del tiles_id[tile]
+        if len(tiles_id) == 0:
+            del self.__ids[type_tile][id]
+        return True
+
+    def maj_id_tile(self, tile:Tile, ancien_id):
+        """
+        appelée par la tile quand son id change (Tile.set_id()), met à jour l'index des ids
+        ne doit pas être utilisée directement
+        """
+        for type_tile in self.__ids:
+            if self.__retirer_id(tile, ancien_id, type_tile):
+                tiles_id = self.__ids[type_tile].get(tile.id)
+                if tiles_id == None:
+                    tiles_id = {}
+                    self.__ids[type_tile][tile.id] = tiles_id
+                tiles_id[tile] = None
+
+    def get_tiles_by_id(self, id, types=("basique", "spawn", "event"), visible=None) -> list:
+        """
+        retourne les tiles qui ont l'id passé en paramètre, sans parcourir la map (index des ids)
+        types : "basique", "spawn" ou "event", ou un tuple de plusieurs types (tous par défaut)
+        visible : None pour toutes les tiles, True pour les tiles visibles seulement, False pour les tiles invisibles seulement
+        les tiles sont rangées par type (dans l'ordre de types), puis dans l'ordre où elles ont été ajoutées à la map
+        l'index est mis à jour par Tile.set_id() (un id modifié directement avec tile.id n'est pas pris en compte)
+        """
+        resultat = []
+        for type_tile in self.__get_types(types):
+            for tile in self.__ids[type_tile].get(id, ()):
+                if visible == None or tile.visible == visible:
+                    resultat.append(tile)
+        return resultat
+
+    def get_nb_tiles_id(self, id, types=("basique", "spawn", "event")) -> int:
+        """
+        retourne le nombre de tiles qui ont l'id passé en paramètre, sans parcourir la map
+        """
+        nb_tiles = 0
+        for type_tile in self.__get_types(types):
+            nb_tiles = nb_tiles + len(self.__ids[type_tile].get(id, ()))
+        return nb_tiles
+
+    def get_ids(self, types=("basique", "spawn", "event")) -> dict:
+        """
+        retourne un dictionnaire id -> nombre de tiles qui ont cet id, sans parcourir la map
+        """
+        compte = {}
+        for type_tile in self.__get_types(types):
+            for id, tiles_id in self.__ids[type_tile].items():
+                compte[id] = compte.get(id, 0) + len(tiles_id)
+        return compte
+
+    def maj_tile(self, tile:Tile):
+        """
+        appelée par la tile quand sa position ou sa visibilité change
+        met à jour l'index spatial, et marque l'ancienne et la nouvelle zone de la tile pour que seule cette partie de la map soit redessinée lors du prochain render()
+        ne doit pas être utilisée directement
+        """
+        for type_tile, grille in self.grilles.items():
+            if tile in grille:
+                self.__noter_zone(grille.get_bornes_rangees(tile))  # ancienne zone
+                if type_tile == "basique" and not tile.get_animated():
+                    self.chunks.marquer(*grille.get_bornes_rangees(tile))
+                    grille.deplacer(tile)
+                    self.chunks.marquer(*grille.get_bornes_rangees(tile))
+                else:
+                    grille.deplacer(tile)
+                self.__noter_zone(grille.get_bornes_rangees(tile))  # nouvelle zone
+
+    def __vider(self):
+        """
+        enlève toutes les tiles de la map (ainsi que de l'index spatial)
+        les listes du dernier render() sont aussi vidées : sinon elles gardent les anciennes tiles, et donc leurs images dans le cache
+        """
+        self.map = []
+        self.spawn_points = []
+        self.event_points = []
+        self.tiles_on_screen = []
+        self.spawn_points_on_screen = []
+        self.event_points_on_screen = []
+        self.invisible_tiles = []
+        self.__images_affichees = {}
+        for grille in self.grilles.values():
+            grille.vider()
+        self.__ids = {"basique": {}, "spawn": {}, "event": {}}
+        self.__tout_redessiner = True
 
     def __charge_tile(self, dossier):
         """
@@ -177,7 +485,6 @@ class Map:
                 # image de base
                 instance_tile = Tile()
                 instance_tile.chemin_image = dossier + tile
-                instance_tile.charger_image()
                 tiles_charge.append(instance_tile)
 
             elif not "." in tile:
@@ -186,11 +493,16 @@ class Map:
                 instance_tile.chemin_image = []
                 for element in os.listdir(dossier + tile + "/"):
                     instance_tile.chemin_image.append(dossier + tile + "/" + element)
-                instance_tile.charger_image()
                 tiles_charge.append(instance_tile)
 
             else:
                 print(str(tile) + " inconnu")
+        # chargement en parallèle des images de toutes les tiles, puis mise en place des images (depuis le cache)
+        # les images préchargées sont gardées jusqu'à la fin des charger_image() pour que le cache ne les supprime pas
+        images_prechargees = precharger_images([(instance_tile, None, None) for instance_tile in tiles_charge])
+        for instance_tile in tiles_charge:
+            instance_tile.charger_image()
+        del images_prechargees
         return tiles_charge
 
     def __create_button(self, screen, text, co:tuple):
@@ -251,14 +563,260 @@ class Map:
     def is_on_screen(self, tile:Tile):
         """
         détermine si la tile est dans le champs de la caméra
+        le test est fait directement avec les coordonnées de base et la taille de l'image actuelle (aucun objet n'est créé)
+        """
+        assert self.__champs != None, "les dimensions d'affichage de la map ne sont pas définies, définissez les avec set_dimensions()"
+        x1, y1, x2, y2 = self.__champs
+        x = tile.x_base
+        y = tile.y_base
+        image = tile.image
+        return x < x2 and x + image.get_width() > x1 and y < y2 and y + image.get_height() > y1
+
+    def filter_on_screen(self, tiles) -> list:
+        """
+        version de is_on_screen() pour plusieurs tiles : retourne la liste des tiles passées en paramètre qui sont dans le champs de la caméra
+        l'ordre des tiles est conservé
+        """
+        assert self.__champs != None, "les dimensions d'affichage de la map ne sont pas définies, définissez les avec set_dimensions()"
+        x1, y1, x2, y2 = self.__champs
+        resultat = []
+        for tile in tiles:
+            x = tile.x_base
+            y = tile.y_base
+            image = tile.image
+            if x < x2 and x + image.get_width() > x1 and y < y2 and y + image.get_height() > y1:
+                resultat.append(tile)
+        return resultat
+
+    def __get_types(self, types) -> tuple:
+        if type(types) == str:
+            types = (types,)
+        for type_tile in types:
+            assert type_tile == "basique" or type_tile == "spawn" or type_tile == "event", "type_tile invalide : " + str(type_tile)
+        return types
+
+    def __chercher(self, x1, y1, x2, y2, types, visible) -> list:
+        """
+        retourne les tiles des types dont l'image actuelle touche le rectangle (x1, y1, x2, y2) en coordonnées de base, x2 et y2 exclus
+        les tiles sont trouvées avec l'index spatial, puis testées avec la taille de leur image actuelle (frame actuelle si animée)
+        """
+        resultat = []
+        for type_tile in self.__get_types(types):
+            for tile in self.grilles[type_tile].chercher(x1, y1, x2, y2):
+                if visible != None and tile.visible != visible:
+                    continue
+                image = tile.image
+                if tile.x_base < x2 and tile.x_base + image.get_width() > x1 and tile.y_base < y2 and tile.y_base + image.get_height() > y1:
+                    resultat.append(tile)
+        return resultat
+
+    def query_rect(self, rect, ecran=False, types=("basique", "spawn", "event"), visible=None) -> list:
+        """
+        retourne les tiles qui touchent le rect (pygame.Rect ou tuple (x, y, largeur, hauteur)), sans parcourir toute la map (index spatial)
+        ecran : si True, le rect est en coordonnées de l'écran (caméra prise en compte), sinon en coordonnées de base (sur la map)
+        types : "basique", "spawn" ou "event", ou un tuple de plusieurs types (tous par défaut)
+        visible : None pour toutes les tiles, True pour les tiles visibles seulement, False pour les tiles invisibles seulement
+        les tiles sont rangées par type (dans l'ordre de types), puis du dernier plan vers le premier plan
+        """
+        rect = pygame.rect.Rect(rect)
+        if ecran:
+            rect.x = rect.x + self.__camera_x
+            rect.y = rect.y + self.__camera_y
+        return self.__chercher(rect.left, rect.top, rect.right, rect.bottom, types, visible)
+
+    def query_point(self, pos:tuple, ecran=False, types=("basique", "spawn", "event"), visible=None) -> list:
+        """
+        retourne les tiles dont l'image contient le point pos (x, y), mêmes paramètres que query_rect()
+        """
+        return self.query_rect((pos[0], pos[1], 1, 1), ecran, types, visible)
+
+    def query_radius(self, centre:tuple, rayon, ecran=False, types=("basique", "spawn", "event"), visible=None) -> list:
+        """
+        retourne les tiles dont l'image touche le cercle de centre centre (x, y) et de rayon rayon, mêmes paramètres que query_rect()
+        """
+        assert rayon >= 0, "le rayon doit être positif"
+        x = centre[0]
+        y = centre[1]
+        if ecran:
+            x = x + self.__camera_x
+            y = y + self.__camera_y
+        resultat = []
+        for tile in self.__chercher(math.floor(x - rayon), math.floor(y - rayon), math.floor(x + rayon) + 1, math.floor(y + rayon) + 1, types, visible):
+            # point de l'image le plus proche du centre
+            proche_x = min(max(x, tile.x_base), tile.x_base + tile.image.get_width() - 1)
+            proche_y = min(max(y, tile.y_base), tile.y_base + tile.image.get_height() - 1)
+            if (proche_x - x) ** 2 + (proche_y - y) ** 2 <= rayon ** 2:
+                resultat.append(tile)
+        return resultat
+
+    def collisions(self, rects, ecran=False, types="basique", visible=True) -> list:
+        """
+        broadphase : retourne en un seul appel les paires (indice du rect dans rects, tile) des tiles qui touchent les rects (par exemple ceux des sprites)
+        chaque rect n'est comparé qu'aux tiles des cases de l'index spatial qu'il touche (le coût dépend du nombre de contacts, pas de la taille de la map)
+        les bornes utilisées sont celles de l'index spatial (plus grande frame si la tile est animée), le test précis reste à faire par le jeu
+        ecran : si True, les rects sont en coordonnées de l'écran (caméra prise en compte), sinon en coordonnées de base (sur la map)
+        types : "basique" par défaut, "spawn" ou "event", ou un tuple de plusieurs types
+        visible : True par défaut pour ne garder que les tiles visibles, False pour les tiles invisibles seulement, None pour toutes
         """
-        temp_rect = tile.cloner()
-        position_x = tile.x_base - self.__camera_x  # en supposant que la caméra agit comme un sprite (positif quand on va vers la droite ou le bas)
-        position_y = tile.y_base - self.__camera_y
-        temp_rect.x = position_x
-        temp_rect.y = position_y
-        temp_rect.maj_rect()
-        return temp_rect.get_tile_rect().colliderect(pygame.rect.Rect((0, 0), (self.largeur, self.hauteur)))    # coordonnées de base : (0,0)
+        rects_base = []
+        for rect in rects:
+            rect = pygame.rect.Rect(rect)
+            if ecran:
+                rect.x = rect.x + self.__camera_x
+                rect.y = rect.y + self.__camera_y
+            rects_base.append(rect)
+        paires = []
+        for type_tile in self.__get_types(types):
+            for indice, tile in self.grilles[type_tile].chercher_rects(rects_base):
+                if visible == None or tile.visible == visible:
+                    paires.append((indice, tile))
+        return paires
+
+    def set_masques_chunks(self, masques_chunks:bool):
+        """
+        si True, overlap_masque() teste les tiles statiques (non animées) avec un masque par chunk (les masques des tiles du chunk réunis)
+        au lieu d'un masque par tile : un ou deux overlap() par acteur au lieu d'un par tile proche
+        les masques des chunks sont calculés lors de la première demande, puis recalculés seulement si une tile du chunk change
+        """
+        assert type(masques_chunks) == bool, "masques_chunks doit être un booléen"
+        self.__masques_chunks = masques_chunks
+
+    def precalculer_masques(self):
+        """
+        calcule à l'avance les masques de collision de toutes les images des tiles de la map (par exemple lors de l'écran de chargement)
+        chaque image n'est calculée qu'une fois, les tiles qui ont la même image partagent le même masque
+        """
+        modeles = set()
+        for tile in self.map:
+            if tile.modele != None and not tile.modele in modeles:
+                modeles.add(tile.modele)
+                if tile.get_animated():
+                    image = tile.image
+                    for frame in tile.liste_frames:
+                        tile.image = frame
+                        tile.get_masque()
+                    tile.image = image
+                else:
+                    tile.get_masque()
+
+    def overlap_masque(self, masque, pos:tuple, ecran=False):
+        """
+        retourne le premier point (x, y) où le masque (pygame.mask.Mask, par exemple celui d'un sprite) placé en pos touche une tile visible de la map,
+        ou None s'il n'y a pas de collision
+        ecran : si True, pos et le point retourné sont en coordonnées de l'écran (caméra prise en compte), sinon en coordonnées de base
+        seules les tiles proches sont testées (index spatial), avec les masques des chunks si set_masques_chunks(True)
+        """
+        x = pos[0]
+        y = pos[1]
+        if ecran:
+            x = x + self.__camera_x
+            y = y + self.__camera_y
+        largeur, hauteur = masque.get_size()
+        point = None
+        if self.__masques_chunks:
+            point = self.__overlap_chunks(masque, x, y)
+        if point == None:
+            for tile in self.grilles["basique"].chercher(x, y, x + largeur, y + hauteur):
+                if tile.get_visible() and (tile.get_animated() or not self.__masques_chunks):
+                    point = tile.get_masque().overlap(masque, (x - tile.x_base, y - tile.y_base))
+                    if point != None:
+                        point = (point[0] + tile.x_base, point[1] + tile.y_base)
+                        break
+        if point != None and ecran:
+            point = (point[0] - self.__camera_x, point[1] - self.__camera_y)
+        return point
+
+    def __overlap_chunks(self, masque, x:int, y:int):
+        """
+        retourne le premier point (en coordonnées de base) où le masque placé en (x, y) touche le masque d'un chunk, ou None
+        les chunks suivants ne sont pas testés (ni leurs masques créés) une fois le point trouvé
+        """
+        largeur, hauteur = masque.get_size()
+        taille = self.chunks.taille_chunk
+        for chunk_x in range(x // taille, (x + largeur - 1) // taille + 1):
+            for chunk_y in range(y // taille, (y + hauteur - 1) // taille + 1):
+                masque_chunk = self.chunks.get_masque((chunk_x, chunk_y))
+                if masque_chunk != None:
+                    point = masque_chunk.overlap(masque, (x - chunk_x * taille, y - chunk_y * taille))
+                    if point != None:
+                        return (point[0] + chunk_x * taille, point[1] + chunk_y * taille)
+        return None
+
+    def query_masque(self, masque, pos:tuple, ecran=False, types="basique", visible=True) -> list:
+        """
+        retourne les tiles dont le masque de collision touche le masque placé en pos (test au pixel près)
+        mêmes paramètres que collisions() (tiles visibles de type "basique" par défaut)
+        """
+        x = pos[0]
+        y = pos[1]
+        if ecran:
+            x = x + self.__camera_x
+            y = y + self.__camera_y
+        largeur, hauteur = masque.get_size()
+        resultat = []
+        for tile in self.__chercher(x, y, x + largeur, y + hauteur, types, visible):
+            if tile.get_masque().overlap(masque, (x - tile.x_base, y - tile.y_base)) != None:
+                resultat.append(tile)
+        return resultat
+
+    def ajouter_acteur(self, acteur, ecran=False):
+        """
+        ajoute un acteur (objet avec un attribut rect, par exemple un pygame.sprite.Sprite) suivi par maj_events()
+        ecran : si True, le rect de l'acteur est en coordonnées de l'écran (caméra prise en compte), sinon en coordonnées de base
+        """
+        assert hasattr(acteur, "rect"), "l'acteur doit avoir un attribut rect"
+        self.__acteurs[acteur] = [ecran, {}]
+
+    def retirer_acteur(self, acteur):
+        """
+        arrête de suivre l'acteur (aucune sortie n'est déclenchée)
+        """
+        self.__acteurs.pop(acteur, None)
+
+    def set_callbacks_events(self, entree=None, dedans=None, sortie=None):
+        """
+        définit les fonctions appelées par maj_events(), avec en paramètres l'acteur et l'event_point (Tile) :
+            - entree quand l'acteur entre dans un event_point
+            - dedans à chaque maj_events() où l'acteur est encore dans l'event_point
+            - sortie quand l'acteur sort d'un event_point (ou quand l'event_point est enlevé de la map)
+        """
+        self.__callbacks_events = (entree, dedans, sortie)
+
+    def maj_events(self) -> list:
+        """
+        à appeler à chaque image, après avoir déplacé les acteurs : compare la position des acteurs avec les event_points
+        seuls les event_points proches de chaque acteur sont testés (index spatial), le coût ne dépend pas du nombre total d'event_points
+        appelle les fonctions définies avec set_callbacks_events(), et retourne la liste des (évènement, acteur, event_point),
+        évènement étant "sortie", "entree" ou "dedans" (dans cet ordre pour chaque acteur)
+        """
+        entree, dedans, sortie = self.__callbacks_events
+        evenements = []
+        for acteur, infos in list(self.__acteurs.items()):
+            rect = pygame.rect.Rect(acteur.rect)
+            if infos[0]:
+                rect.x = rect.x + self.__camera_x
+                rect.y = rect.y + self.__camera_y
+            anciens = infos[1]
+            actuels = {}
+            for tile in self.__chercher(rect.left, rect.top, rect.right, rect.bottom, "event", None):
+                actuels[tile] = None
+            infos[1] = actuels
+            for tile in anciens:
+                if not tile in actuels:
+                    evenements.append(("sortie", acteur, tile))
+            for tile in actuels:
+                if tile in anciens:
+                    evenements.append(("dedans", acteur, tile))
+                else:
+                    evenements.append(("entree", acteur, tile))
+        for evenement, acteur, tile in evenements:
+            if evenement == "entree" and entree != None:
+                entree(acteur, tile)
+            elif evenement == "dedans" and dedans != None:
+                dedans(acteur, tile)
+            elif evenement == "sortie" and sortie != None:
+                sortie(acteur, tile)
+        return evenements
 
     def __move_selon_camera(self,tile:Tile):
         """
@@ -280,56 +838,46 @@ class Map:
             - &slanimation&
             - &slnewtile&
             - &sltype&
+        le texte est écrit au fur et à mesure dans un fichier temporaire, qui remplace le fichier de save seulement une fois terminé
+        (si la sauvegarde est interrompue, l'ancienne save n'est pas abîmée)
         """
-        # première partie de la save : les infos de la map
-        text_save = str(self.chemin_dossier) + "&slinfos&" + str(self.background) + "&sltype&"
-        # deuxième partie de la save : les différentes tiles
-        # tiles basiques
-        have_tiles = False
-        for tile in self.get_all_tiles():   # attention, les tiles peuvent être animées
-            pygame.event.get()      # anti ne répond pas
-            have_tiles = True
-            # gestion des chemins des images
-            chemin_image_tile = ""
-            if type(tile.chemin_image) == list:
-                for chemin in tile.chemin_image:
-                    chemin_image_tile = chemin_image_tile + chemin + "&slanimation&"
-                chemin_image_tile = chemin_image_tile[:len(chemin_image_tile)-13]    # enlever le &slanimation& de fin
-            else:
-                chemin_image_tile = tile.chemin_image
-
-            # création du texte
-            # texte de la forme id,x_base,y_base,animated,proportion,chemin_image : séparé par &sltile&
-            text_infos_tile_basique = str(tile.id) + "&sltile&" + str(tile.x_base) + "&sltile&" + str(tile.y_base) + "&sltile&" + str(tile.animated) + "&sltile&" + str(tile.proportion) + "&sltile&" + chemin_image_tile + "&slnewtile&"
-            text_save = text_save + text_infos_tile_basique
-        if have_tiles:
-            text_save = text_save[:len(text_save)-11]
-        text_save = text_save + "&sltype&"
-
-        # spawn points
-        have_spawn_points = False
-        for tile in self.get_all_spawn_points():
-            pygame.event.get()  # anti ne répond pas
-            have_spawn_points = True
-            # texte de la forme id,x_base,y_base,largeur,hauteur : séparé par &sltile&
-            text_save = text_save + str(tile.id) + "&sltile&" + str(tile.x_base) + "&sltile&" + str(tile.y_base) + "&sltile&" + str(tile.get_tile_rect().width) + "&sltile&" + str(tile.get_tile_rect().height) + "&slnewtile&"
-        if have_spawn_points:
-            text_save = text_save[:len(text_save)-11]
-        text_save = text_save + "&sltype&"
-
-        # event points
-        have_event_points = False
-        for tile in self.get_all_event_points():
-            pygame.event.get()  # anti ne répond pas
-            have_event_points = True
-            text_save = text_save + str(tile.id) + "&sltile&" + str(tile.x_base) + "&sltile&" + str(tile.y_base) + "&sltile&" + str(tile.get_tile_rect().width) + "&sltile&" + str(tile.get_tile_rect().height) + "&slnewtile&"
-        if have_event_points:
-            text_save = text_save[:len(text_save) - 11] # enlever le &slnewtile& en trop
-
-        # écriture dans le fichier
-        fichier_save = open(nom_fichier, "w")
-        fichier_save.write(text_save)
-        fichier_save.close()
+        dossier = os.path.dirname(os.path.abspath(nom_fichier))
+        descripteur, nom_temporaire = tempfile.mkstemp(prefix=".save_", suffix=".tmp", dir=dossier)
+        try:
+            with os.fdopen(descripteur, "w", buffering=1024*1024) as fichier_save:
+                # première partie de la save : les infos de la map
+                fichier_save.write(str(self.chemin_dossier) + "&slinfos&" + str(self.background) + "&sltype&")
+
+                # deuxième partie de la save : les différentes tiles
+                # tiles basiques, texte de la forme id,x_base,y_base,animated,proportion,chemin_image : séparé par &sltile&
+                separateur = ""     # pas de &slnewtile& avant la première tile
+                for tile in self.map:   # attention, les tiles peuvent être animées
+                    # gestion des chemins des images
+                    if type(tile.chemin_image) == list:
+                        chemin_image_tile = "&slanimation&".join(tile.chemin_image)
+                    else:
+                        chemin_image_tile = tile.chemin_image
+                    fichier_save.write(separateur + str(tile.id) + "&sltile&" + str(tile.x_base) + "&sltile&" + str(tile.y_base) + "&sltile&" + str(tile.animated) + "&sltile&" + str(tile.proportion) + "&sltile&" + chemin_image_tile)
+                    separateur = "&slnewtile&"
+
+                # spawn points puis event points, texte de la forme id,x_base,y_base,largeur,hauteur : séparé par &sltile&
+                for points in (self.spawn_points, self.event_points):
+                    fichier_save.write("&sltype&")
+                    separateur = ""
+                    for tile in points:
+                        fichier_save.write(separateur + str(tile.id) + "&sltile&" + str(tile.x_base) + "&sltile&" + str(tile.y_base) + "&sltile&" + str(tile.get_tile_rect().width) + "&sltile&" + str(tile.get_tile_rect().height))
+                        separateur = "&slnewtile&"
+            # mkstemp crée le fichier en lecture/écriture pour le propriétaire seulement :
+            # on garde les droits de la save remplacée, ou on met ceux d'un open() classique si elle n'existe pas
+            try:
+                droits = os.stat(nom_fichier).st_mode & 0o7777
+            except FileNotFoundError:
+                droits = 0o666 & ~UMASK
+            os.chmod(nom_temporaire, droits)
+            os.replace(nom_temporaire, nom_fichier)
+        except BaseException:
+            os.remove(nom_temporaire)
+            raise
 
     def __str_to_bool(self, texte:str) -> bool:
         if texte == "True":
@@ -339,196 +887,371 @@ class Map:
 
     def maj_map_image(self):
         """
-        les tiles qui ne sont pas animées sont blitées sur une grande surface, qui sera tout le temps blitée sur le screen
-        si la position ou la visibilité d'une tile est modifiée, cette méthode doit être appellée, sinon le visuel ne changera pas
+        les tiles qui ne sont pas animées sont blitées sur des chunks (surfaces de taille fixe), qui seront blités sur le screen lors du render
+        les chunks sont créés seulement quand ils arrivent près de la caméra
+        si la position ou la visibilité d'une tile est modifiée sans passer par Tile.set_visible() ou Tile.set_co_base(), cette méthode doit être appellée, sinon le visuel ne changera pas
         """
-        # calcul des dimensions de la map
-        largeur_max = float("inf") * -1
-        hauteur_max = float("inf") * -1
-        if len(self.map) == 0:
-            largeur_max = 1
-            hauteur_max = 1
-        for tile in self.map:
-            #print(not tile.get_animated,  tile.get_visible())
-            if not tile.get_animated() and tile.get_visible():
-                if tile.get_co_base()[0] + tile.image.get_size()[0] > largeur_max:
-                    largeur_max = tile.get_co_base()[0] + tile.image.get_size()[0]
-
-                if tile.get_co_base()[1] + tile.image.get_size()[1] > hauteur_max:
-                    hauteur_max = tile.get_co_base()[1] + tile.image.get_size()[1]
-
-        largeur_min = float("inf")
-        hauteur_min = float("inf")
-        for tile in self.map:
-            if not tile.get_animated() and tile.get_visible():
-                #print("tile", tile.get_co_base(), tile.get_co_base()[0] < largeur_min)
-                if tile.get_co_base()[0]< largeur_min:
-                    largeur_min = tile.get_co_base()[0]
-
-                if tile.get_co_base()[1] < hauteur_min:
-                    hauteur_min = tile.get_co_base()[1]
-
-
-        #print("a", largeur_min, hauteur_min)
-        if largeur_min < 0:
-            largeur_max = largeur_max + abs(largeur_min)
-            self.decalage_negatif = (abs(largeur_min), 0)
-            largeur_min = 0
-
-        if hauteur_min < 0:
-            hauteur_max = hauteur_max + abs(hauteur_min)
-            self.decalage_negatif = (self.decalage_negatif[0], abs(hauteur_min))
-            hauteur_min = 0
-
-        #print((largeur_max, hauteur_max))
-
-        self.surface_map = pygame.surface.Surface((largeur_max, hauteur_max), pygame.SRCALPHA) # SRCALPHA pour la transparence
+        if self.__stats != None:
+            debut = time.perf_counter()
+        self.chunks.vider()
+        self.__tout_redessiner = True
+        if self.__stats != None:
+            self.__stats.maj_map_image = self.__stats.maj_map_image + 1
+            self.__stats.temps_maj_map_image = self.__stats.temps_maj_map_image + time.perf_counter() - debut
+
+    def __parcourir_save_texte(self, nom_fichier):
+        """
+        lit une save au format txt (celui de __save) en un seul passage, morceau par morceau (le fichier n'est jamais chargé en entier)
+        générateur qui retourne d'abord ("infos", (chemin_dossier, background)), puis un (type, élément) par tile :
+            - ("basique", (id, x_base, y_base, animated, proportion, chemin_image)), chemin_image étant une liste si la tile est animée
+            - ("spawn", (id, x_base, y_base, largeur, hauteur)) et ("event", (id, x_base, y_base, largeur, hauteur))
+        """
+        types = ("infos", "basique", "spawn", "event")     # ordre des parties de la save, séparées par &sltype&
+        section = 0
+        tampon = ""
+        debut = 0   # début de l'élément suivant dans tampon (tampon n'est pas recopié à chaque élément)
+        # position des prochains séparateurs dans tampon : -1 s'il n'y en a plus dans tampon, -2 si elle doit être recherchée
+        position_type = -2
+        position_tile = -2
+        fin_fichier = False
+        fichier_save = open(nom_fichier, "r", buffering=1024*1024)
+        while True:
+            # recherche du prochain séparateur (&sltype& ou &slnewtile&), les positions déjà trouvées sont réutilisées
+            if position_type == -2 or 0 <= position_type < debut:
+                position_type = tampon.find("&sltype&", debut)
+            if position_tile == -2 or 0 <= position_tile < debut:
+                position_tile = tampon.find("&slnewtile&", debut)
+            if position_tile != -1 and (position_type == -1 or position_tile < position_type):
+                element = tampon[debut:position_tile]
+                debut = position_tile + 11
+                nouvelle_section = section
+            elif position_type != -1:
+                element = tampon[debut:position_type]
+                debut = position_type + 8
+                nouvelle_section = section + 1
+            elif not fin_fichier:
+                morceau = fichier_save.read(1024*1024)
+                if morceau == "":
+                    fin_fichier = True
+                else:
+                    tampon = tampon[debut:] + morceau
+                    debut = 0
+                    position_type = -2
+                    position_tile = -2
+                continue
+            else:
+                # dernier élément du fichier
+                element = tampon[debut:]
+                nouvelle_section = len(types)
+
+            if types[section] == "infos":
+                infos = element.split("&slinfos&")
+                yield ("infos", (infos[0], infos[1]))
+            elif element != "":     # une partie vide ne contient pas de tile
+                attributs = element.split("&sltile&")
+                if types[section] == "basique":
+                    # texte de la forme id,x_base,y_base,animated,proportion,chemin_image : séparé par &sltile&
+                    liste_chemins = attributs[5].split("&slanimation&")
+                    if len(liste_chemins) == 1:
+                        chemin_image = liste_chemins[0]
+                    else:
+                        chemin_image = liste_chemins
+                    yield ("basique", (attributs[0], int(attributs[1]), int(attributs[2]), self.__str_to_bool(attributs[3]), int(attributs[4]), chemin_image))
+                else:
+                    # texte de la forme id,x_base,y_base,largeur,hauteur : séparé par &sltile&
+                    yield (types[section], (attributs[0], int(attributs[1]), int(attributs[2]), int(attributs[3]), int(attributs[4])))
+            section = nouvelle_section
+            if section >= len(types):
+                break
+        fichier_save.close()
 
-        # blit des éléments sur la surface
-        for tile in self.map:
-            if not tile.get_animated() and tile.get_visible():
-                #print("cos", (tile.get_co_base()[0] + self.decalage_negatif[0], tile.get_co_base()[1] + self.decalage_negatif[1]))
-                self.surface_map.blit(tile.image, (tile.get_co_base()[0] + self.decalage_negatif[0], tile.get_co_base()[1] + self.decalage_negatif[1]))
+    def __parcourir_save(self, nom_fichier):
+        """
+        même générateur que __parcourir_save_texte(), mais pour les deux formats de save (txt ou binaire, détecté automatiquement)
+        """
+        if SaveBinaire.est_binaire(nom_fichier):
+            save = SaveBinaire.lire(nom_fichier)
+            yield ("infos", (save["chemin_dossier"], save["background"]))
+            for type_tile, cle in (("basique", "tiles"), ("spawn", "spawn_points"), ("event", "event_points")):
+                for element in save[cle]:
+                    yield (type_tile, element)
+        else:
+            yield from self.__parcourir_save_texte(nom_fichier)
 
+    def convertir_save(self, nom_fichier_txt, nom_fichier_binaire):
+        """
+        convertit une save au format txt en save au format binaire (plus petite et plus rapide à charger)
+        aucune image n'est chargée, la map actuelle n'est pas modifiée
+        """
+        save = {"tiles": [], "spawn_points": [], "event_points": []}
+        cles = {"basique": "tiles", "spawn": "spawn_points", "event": "event_points"}
+        for type_element, element in self.__parcourir_save_texte(nom_fichier_txt):
+            if type_element == "infos":
+                save["chemin_dossier"], save["background"] = element
+            else:
+                save[cles[type_element]].append(element)
+        SaveBinaire.ecrire(nom_fichier_binaire, save)
 
-    def charger_map(self, nom_fichier):
+    def charger_map(self, nom_fichier, progression=None):
         """
         lit le fichier, et charge les attributs pour que la map soit prête à l'emploi
+        le fichier peut être une save au format txt ou au format binaire (détecté automatiquement)
         met également la caméra à (0,0)
+        les images du cache qui ne sont plus utilisées (celles de l'ancien niveau par exemple) sont supprimées à la fin du chargement
+        progression est une fonction optionnelle appelée régulièrement pendant le chargement avec le nombre de tiles chargées
+        (c'est à elle de faire pygame.event.get() si la fenêtre doit continuer à répondre pendant le chargement)
         """
-        self.map = []
-        self.spawn_points = []
-        self.event_points = []
+        self.__vider()
         self.__camera_x = 0
         self.__camera_y = 0
+        self.__maj_champs()
         self.__previous_camera_x = 0
         self.__previous_camera_y = 0
-        fichier_save = open(nom_fichier, "r")
-        text_save = fichier_save.read()
-        fichier_save.close()
-        # découpage du txt_save
-
-        liste_save = text_save.split("&sltype&")
-        # infos
-        infos = liste_save[0].split("&slinfos&")
-        self.chemin_dossier = infos[0]
-        self.background = infos[1]
-
-        # tiles basiques
-        tiles_basiques = liste_save[1]
-        # texte de la forme id,x_base,y_base,animated,proportion,chemin_image : séparé par &sltile&
-        if not tiles_basiques.split("&slnewtile&")[0] == "":  # au cas où il n'y a pas de tile
-            for tile_str in tiles_basiques.split("&slnewtile&"):
-                pygame.event.get()  # anti ne répond pas
-                attributs_tile = tile_str.split("&sltile&")
-                new_tile = Tile()
-                new_tile.id = attributs_tile[0]
-                new_tile.x_base = int(attributs_tile[1])
-                new_tile.y_base = int(attributs_tile[2])
-                new_tile.animated = self.__str_to_bool(attributs_tile[3])
-                new_tile.proportion = int(attributs_tile[4])
-                # chemin_image (peut être animée)
-                liste_chemins = attributs_tile[5].split("&slanimation&")
-                if len(liste_chemins) == 1:
-                    new_tile.chemin_image = liste_chemins[0]
-                else:
-                    new_tile.chemin_image = []
-                    for chemin in liste_chemins:
-                        new_tile.chemin_image.append(chemin)
-                new_tile.charger_image()
-                new_tile.maj_rect()
-                self.map.append(new_tile)
+
+        # création des tiles, sans leurs images
+        images_points = {"spawn": "mapmaker_assets/spawn_point.png", "event": "mapmaker_assets/event_point.png"}
+        a_charger = []  # (tile, largeur, hauteur, type), dans l'ordre de la save
+        for type_element, element in self.__parcourir_save(nom_fichier):
+            if type_element == "infos":
+                self.chemin_dossier, self.background = element
+                continue
+            new_tile = Tile()
+            new_tile.id = element[0]
+            new_tile.x_base = element[1]
+            new_tile.y_base = element[2]
+            if type_element == "basique":
+                # animated n'est pas utilisé : charger_image() le déduit de chemin_image
+                new_tile.proportion = element[4]
+                new_tile.chemin_image = element[5]  # peut être une liste (tile animée)
+                a_charger.append((new_tile, None, None, type_element))
+            else:
+                # spawn point ou event point
+                new_tile.chemin_image = images_points[type_element]
+                a_charger.append((new_tile, element[3], element[4], type_element))
+
+        # chargement en parallèle de toutes les images différentes, puis des images de chaque tile (depuis le cache)
+        # les images préchargées sont gardées jusqu'à la fin des charger_image() pour que le cache ne les supprime pas
+        images_prechargees = precharger_images([(tile, largeur, hauteur) for tile, largeur, hauteur, type_element in a_charger])
+        nb_elements = 0
+        for tile, largeur, hauteur, type_element in a_charger:
+            tile.charger_image(largeur, hauteur)
+            self.__add_tile(tile, type_element)
+            nb_elements = nb_elements + 1
+            if progression != None and nb_elements % 1000 == 0:
+                progression(nb_elements)
+        del images_prechargees
         self.maj_map_image()
-        #print("truc image", self.surface_map)
-
-        # spawn points
-        tiles_spawn_points = liste_save[2]
-        # texte de la forme id,x_base,y_base,largeur,hauteur : séparé par &sltile&
-        if not tiles_spawn_points.split("&slnewtile&")[0] == "":    # au cas où il n'y a pas de tile
-            for spawn_point_str in tiles_spawn_points.split("&slnewtile&"):
-                pygame.event.get()  # anti ne répond pas
-                attributs_spawn_point = spawn_point_str.split("&sltile&")
-                new_spawn_point = Tile()
-                new_spawn_point.id = attributs_spawn_point[0]
-                new_spawn_point.x_base = int(attributs_spawn_point[1])
-                new_spawn_point.y_base = int(attributs_spawn_point[2])
-                new_spawn_point.chemin_image = "mapmaker_assets/spawn_point.png"
-                new_spawn_point.charger_image(int(attributs_spawn_point[3]), int(attributs_spawn_point[4]))
-                new_spawn_point.maj_rect()
-                self.spawn_points.append(new_spawn_point)
-
-        # event points
-        tiles_event_points = liste_save[3]
-        # texte de la forme id,x_base,y_base,largeur,hauteur : séparé par &sltile&
-        if not tiles_event_points.split("&slnewtile&")[0] == "":  # au cas où il n'y a pas de tile
-            for event_point_str in tiles_event_points.split("&slnewtile&"):
-                pygame.event.get()  # anti ne répond pas
-                attributs_event_point = event_point_str.split("&sltile&")
-                new_event_point = Tile()
-                new_event_point.id = attributs_event_point[0]
-                new_event_point.x_base = int(attributs_event_point[1])
-                new_event_point.y_base = int(attributs_event_point[2])
-                new_event_point.chemin_image = "mapmaker_assets/event_point.png"
-                new_event_point.charger_image(int(attributs_event_point[3]), int(attributs_event_point[4]))
-                new_event_point.maj_rect()
-                self.event_points.append(new_event_point)
-
-
-    def render(self, screen):
+        if progression != None:
+            progression(nb_elements)
+
+        # libération des images de l'ancien niveau
+        cache_image.decharger()
+
+    def render(self, screen, zones=None) -> list:
         """
         blit la map de manière optimisée
         met à jour les méthodes get_tiles_on_screen(), get_event_points_on_screen() et get_spawn_points_on_screen(), ainsi que Tile.get_tile_rect() et Tile.get_co()
         pour fonctionner, cette méthode a besoin des trois listes avec des tiles avec ses cos de base, et avec l'image de chargée
+        retourne la liste des rects de screen qui ont changé (à passer à Screen.flip() ou à pygame.display.update())
+        avec set_rendu_partiel(True), si la caméra, les dimensions, le background et screen n'ont pas changé depuis le render() précédent,
+        seules les zones modifiées sont redessinées, ainsi que les zones passées en paramètre (rects de screen, par exemple là où des sprites
+        ont été blités par dessus la map lors de l'image précédente)
         """
+        stats = self.__stats
+        if stats != None:
+            stats.debut_render()
+            debut_render = time.perf_counter()
         self.__previous_camera_x = self.__camera_x
         self.__previous_camera_y = self.__camera_y
 
         self.tiles_on_screen = []
         self.event_points_on_screen = []
         self.spawn_points_on_screen = []
-        self.invisible_tiles = []
         dimensions = self.get_dimensions()
         assert dimensions[0] != None and dimensions[1] != None, "les dimensions d'affichage de la map ne sont pas définies, définissez les avec set_dimensions()"
-        if not self.background == "none":
-            screen.fill(self.background)
+        self.__maj_champs()     # au cas où largeur ou hauteur ont été modifiés directement
+        rendu = (screen, screen.get_size(), self.__camera_x, self.__camera_y, dimensions, self.background)
+        partiel = self.__rendu_partiel and not self.__tout_redessiner and not self.is_map_maker and rendu == self.__dernier_rendu
+        defilement = self.__defilement and not self.background == "none"
+        self.__dernier_rendu = rendu
+        zones_modifiees = self.__zones_modifiees
+        self.__zones_modifiees = []
+        champs_screen = pygame.rect.Rect(0, 0, dimensions[0], dimensions[1]).clip(screen.get_rect())
 
         # tiles dans self.map
-        # blit de surface_map
-        assert self.surface_map != None, "la map n'est pas chargée"
-
-        x_blit = self.__camera_x*-1 - self.decalage_negatif[0]
-        y_blit = self.__camera_y*-1 - self.decalage_negatif[1]
-        rect = pygame.rect.Rect(self.decalage_negatif[0]+self.__camera_x, self.decalage_negatif[1]+self.__camera_y, self.largeur, self.hauteur)
-        screen.blit(self.surface_map, (0, 0), area=rect)
-        for tile in self.map:
-            # calcul de est-ce que la tile est dans le champs
+        # blit des chunks de la couche statique qui sont dans le champs (après avoir redessiné les zones modifiées)
+        if stats != None:
+            debut = time.perf_counter()
+        if not partiel and not self.background == "none" and (not defilement or not champs_screen.contains(screen.get_rect())):
+            screen.fill(self.background)
+        if stats != None:
+            stats.temps_remplissage = time.perf_counter() - debut
+            debut = time.perf_counter()
+        blits_chunks = 0
+        self.chunks.maj()
+        if defilement:
+            blits_chunks = self.__maj_couche_statique(zones_modifiees)
+        self.__tout_redessiner = False
+        if not partiel:
+            if defilement:
+                screen.blit(self.__couche_statique, (0, 0))
+                blits_chunks = blits_chunks + 1
+            else:
+                blits_chunks = self.chunks.render(screen, *self.__champs)
+        if stats != None:
+            stats.partiel = partiel
+            stats.blits_chunks = blits_chunks
+            stats.temps_couche_statique = time.perf_counter() - debut
+            debut = time.perf_counter()
+        # seules les tiles des cases de la grille touchées par le champs sont testées
+        tiles_testees = self.grilles["basique"].chercher(*self.__champs)
+        tiles_champs = self.filter_on_screen(tiles_testees)
+        if stats != None:
+            stats.tiles_testees = len(tiles_testees)
+            stats.tiles_ecartees = len(tiles_testees) - len(tiles_champs)
+            stats.temps_tri = time.perf_counter() - debut
+            debut = time.perf_counter()
+        temps = pygame.time.get_ticks()
+        images_affichees = {}
+        blits_animees = 0
+        for tile in tiles_champs:
+            # la tile est dans le champs, il faut donc la mettre dans tiles_on_screen (si elle est visible)
             if tile.get_visible():
-                if self.is_on_screen(tile):
-                    # la tile est dans le champs, il faut donc la mettre dans tiles_on_screen
-                    self.__move_selon_camera(tile)
-                    self.tiles_on_screen.append(tile)
-
-                    # on affiche la tile seulement si elle est animée
-                    if tile.get_animated():
+                if self.__animation_auto and tile.get_animated():
+                    # frame calculée selon le temps : une tile qui revient dans le champs est directement à la bonne frame
+                    frame = self.__get_frame_animation(tile.animation, temps)
+                    if frame != tile.actual_frame:
+                        tile.actual_frame = frame
+                        tile.image = tile.liste_frames[frame]
+                self.__move_selon_camera(tile)
+                self.tiles_on_screen.append(tile)
+
+                # on affiche la tile seulement si elle est animée
+                if tile.get_animated():
+                    if self.__rendu_partiel:
+                        images_affichees[tile] = tile.image
+                        if partiel and self.__images_affichees.get(tile) is not tile.image:
+                            zones_modifiees.append(self.grilles["basique"].get_bornes_rangees(tile))
+                    if not partiel:
                         screen.blit(tile.image, (tile.get_co()))
-            else:
-                self.invisible_tiles.append(tile)
+                        blits_animees = blits_animees + 1
+        self.__images_affichees = images_affichees
+        if stats != None:
+            stats.tiles_affichees = len(self.tiles_on_screen)
+            stats.blits_animees = blits_animees
+            stats.temps_tiles = time.perf_counter() - debut
+            debut = time.perf_counter()
 
         # tiles dans spawn_points
-        for tile in self.spawn_points:
-            if self.is_on_screen(tile):
-                self.__move_selon_camera(tile)
-                self.spawn_points_on_screen.append(tile)
-                if self.is_map_maker:
-                    screen.blit(tile.image, (tile.get_co()))
+        for tile in self.filter_on_screen(self.grilles["spawn"].chercher(*self.__champs)):
+            self.__move_selon_camera(tile)
+            self.spawn_points_on_screen.append(tile)
+            if self.is_map_maker:
+                screen.blit(tile.image, (tile.get_co()))
 
         # tiles dans event_points
-        for tile in self.event_points:
-            if self.is_on_screen(tile):
-                self.__move_selon_camera(tile)
-                self.event_points_on_screen.append(tile)
-                if self.is_map_maker:
-                    screen.blit(tile.image, (tile.get_co()))
+        for tile in self.filter_on_screen(self.grilles["event"].chercher(*self.__champs)):
+            self.__move_selon_camera(tile)
+            self.event_points_on_screen.append(tile)
+            if self.is_map_maker:
+                screen.blit(tile.image, (tile.get_co()))
+        if stats != None:
+            if self.is_map_maker:
+                stats.blits_points = len(self.spawn_points_on_screen) + len(self.event_points_on_screen)
+            stats.temps_points = time.perf_counter() - debut
+            debut = time.perf_counter()
+
+        if not partiel:
+            if not self.background == "none":
+                rects = [screen.get_rect()]
+            else:
+                rects = [champs_screen]
+        else:
+            # rendu partiel : seules les zones modifiées sont redessinées
+            rects = []
+            for x1, y1, x2, y2 in zones_modifiees:
+                # pas limité au champs : une tile animée à cheval sur le bord du champs déborde sur le screen
+                rect = pygame.rect.Rect(x1 - self.__camera_x, y1 - self.__camera_y, x2 - x1, y2 - y1).clip(screen.get_rect())
+                if rect.width > 0 and rect.height > 0:
+                    rects.append(rect)
+            if zones != None:
+                for zone in zones:
+                    rect = pygame.rect.Rect(zone).clip(screen.get_rect())
+                    if rect.width > 0 and rect.height > 0:
+                        rects.append(rect)
+            for rect in rects:
+                self.__redessiner_zone(screen, rect, champs_screen)
+
+        if stats != None:
+            stats.zones_redessinees = len(rects) if partiel else 0
+            stats.temps_zones = time.perf_counter() - debut
+            stats.temps_total = time.perf_counter() - debut_render
+            stats.renders = stats.renders + 1
+            if self.__callback_stats != None:
+                self.__callback_stats(stats)
+        return rects
+
+    def __redessiner_zone(self, screen, rect:pygame.rect.Rect, champs_screen:pygame.rect.Rect):
+        """
+        redessine entièrement la zone rect de screen (background, chunks, puis tiles animées) comme le ferait un render() complet,
+        utilisé par le rendu partiel de render()
+        """
+        ancien_clip = screen.get_clip()
+        screen.set_clip(rect)
+        if not self.background == "none":
+            screen.fill(self.background, rect)
+        partie = rect.clip(champs_screen)   # les chunks ne sont blités que dans le champs
+        if partie.width > 0 and partie.height > 0:
+            if self.__defilement and not self.background == "none":
+                screen.blit(self.__couche_statique, partie, partie)    # la couche statique est déjà à jour
+            else:
+                self.chunks.render(screen, partie.x + self.__camera_x, partie.y + self.__camera_y, partie.right + self.__camera_x, partie.bottom + self.__camera_y, 0, (partie.x, partie.y))
+        for tile in self.filter_on_screen(self.grilles["basique"].chercher(rect.x + self.__camera_x, rect.y + self.__camera_y, rect.right + self.__camera_x, rect.bottom + self.__camera_y)):
+            if tile.get_animated() and tile.get_visible():
+                screen.blit(tile.image, (tile.get_co()))
+        screen.set_clip(ancien_clip)
+
+    def __maj_couche_statique(self, zones_modifiees:list):
+        """
+        met à jour la couche statique du mode défilement pour la caméra actuelle, retourne le nombre de blits de chunks
+        si la caméra a bougé de moins que le champs, la couche est décalée et seules les bandes découvertes sont recomposées
+        les zones modifiées (coordonnées de base) sont aussi recomposées
+        """
+        largeur = self.largeur
+        hauteur = self.hauteur
+        couche = self.__couche_statique
+        if couche == None or couche.get_size() != (largeur, hauteur) or self.__tout_redessiner or self.__couche_infos[2] != self.background:
+            couche = pygame.surface.Surface((largeur, hauteur))
+            self.__couche_statique = couche
+            rects = [couche.get_rect()]
+        else:
+            decalage_x = self.__camera_x - self.__couche_infos[0]
+            decalage_y = self.__camera_y - self.__couche_infos[1]
+            if abs(decalage_x) >= largeur or abs(decalage_y) >= hauteur:
+                rects = [couche.get_rect()]
+            else:
+                rects = []
+                if decalage_x != 0 or decalage_y != 0:
+                    couche.scroll(-decalage_x, -decalage_y)
+                    # bandes découvertes par le décalage
+                    if decalage_x > 0:
+                        rects.append(pygame.rect.Rect(largeur - decalage_x, 0, decalage_x, hauteur))
+                    elif decalage_x < 0:
+                        rects.append(pygame.rect.Rect(0, 0, -decalage_x, hauteur))
+                    if decalage_y > 0:
+                        rects.append(pygame.rect.Rect(0, hauteur - decalage_y, largeur, decalage_y))
+                    elif decalage_y < 0:
+                        rects.append(pygame.rect.Rect(0, 0, largeur, -decalage_y))
+                for x1, y1, x2, y2 in zones_modifiees:
+                    rect = pygame.rect.Rect(x1 - self.__camera_x, y1 - self.__camera_y, x2 - x1, y2 - y1).clip(couche.get_rect())
+                    if rect.width > 0 and rect.height > 0:
+                        rects.append(rect)
+        self.__couche_infos = (self.__camera_x, self.__camera_y, self.background)
+        nb_blits = 0
+        for rect in rects:
+            couche.fill(self.background, rect)
+            nb_blits = nb_blits + self.chunks.render(couche, rect.x + self.__camera_x, rect.y + self.__camera_y, rect.right + self.__camera_x, rect.bottom + self.__camera_y, 1, (rect.x, rect.y))
+        return nb_blits
 
     def update_rect_pos(self, rect:pygame.rect.Rect):
         """
@@ -636,7 +1359,7 @@ class Map:
                         elif charger_sauvegarde_btn.collidepoint(event.pos):
                             if not chemin_dossier[len(chemin_dossier)-4:] == ".txt":  # chemin_dossier est un fichier txt
                                 chemin_dossier = chemin_dossier + ".txt"
-                            self.charger_map(chemin_dossier)
+                            self.charger_map(chemin_dossier, lambda nb_elements: pygame.event.get())     # anti ne répond pas
                             boucle_dossier = False
             clock_dossier.tick(fps)
 
@@ -665,11 +1388,12 @@ class Map:
             # assistant id du mapmaker
             all_tiles_on_screen = self.get_tiles_on_screen() + self.get_spawn_points_on_screen() + self.get_event_points_on_screen()
             if assistant_id:
-                for tile in all_tiles_on_screen:
-                    if tile.get_id() == id_text:
-                        carre_rouge = pygame.transform.scale(pixel_rouge, tile.get_tile_rect().size)
-                        carre_rouge.set_alpha(128)
-                        screen.blit(carre_rouge, (tile.get_tile_rect().x, tile.get_tile_rect().y))
+                # tiles dans le champs qui ont l'id (les spawn_points et les event_points sont invisibles)
+                tiles_id = self.filter_on_screen(self.get_tiles_by_id(id_text, "basique", True) + self.get_tiles_by_id(id_text, ("spawn", "event")))
+                for tile in tiles_id:
+                    carre_rouge = pygame.transform.scale(pixel_rouge, tile.get_tile_rect().size)
+                    carre_rouge.set_alpha(128)
+                    screen.blit(carre_rouge, (tile.get_tile_rect().x, tile.get_tile_rect().y))
 
             # affichage tile selectionnée au niveau de la souris
             if tile_selectionee != None:
@@ -680,9 +1404,11 @@ class Map:
                         tile_selectionee.charger_image(espacement_x, espacement_y)
                     else:
                         tile_selectionee.charger_image()
+                    # copie car l'image de la tile est partagée avec les tiles de la map (set_alpha les rendrait transparentes)
+                    tile_image = tile_selectionee.image.copy()
+                    tile_image.set_alpha(128)
                     charge_tile_selectionee = False
 
-                tile_image = tile_selectionee.image
                 mouse_pos = pygame.mouse.get_pos()
                 if mouse_pos[0] < 1920 - 600:
                     if quadrillage:
@@ -693,7 +1419,6 @@ class Map:
                         x_affichage = mouse_pos[0]-(tile_image.get_size()[0]/2)
                         y_affichage = mouse_pos[1]-(tile_image.get_size()[1]/2)
 
-                    tile_image.set_alpha(128)
                     screen.blit(tile_image, (x_affichage, y_affichage)) # x et y de l'affichage
 
             # affichage de l'id si tab est appuyé
@@ -808,18 +1533,13 @@ class Map:
                     if event.button == 3:
                         # suppression de la tile au niveau de la souris sur la map
                         right_click = False
-                        if not shift_pressed:
-                            for tile in self.get_tiles_on_screen():
-                                if tile.get_tile_rect().collidepoint(event.pos):
-                                    self.__remove_tile(tile, "basique")
-                            for tile in self.get_spawn_points_on_screen():
-                                if tile.get_tile_rect().collidepoint(event.pos):
-                                    self.__remove_tile(tile, "spawn")
-                            for tile in self.get_event_points_on_screen():
-                                if tile.get_tile_rect().collidepoint(event.pos):
-                                    self.__remove_tile(tile, "event")
-
-                            self.maj_map_image()
+                        if not shift_pressed and event.pos[0] < self.largeur and event.pos[1] < self.hauteur:
+                            for tile in self.query_point(event.pos, True, "basique", True):
+                                self.__remove_tile(tile, "basique")
+                            for type_tile in ("spawn", "event"):
+                                # les spawn_points et les event_points sont invisibles
+                                for tile in self.query_point(event.pos, True, type_tile):
+                                    self.__remove_tile(tile, type_tile)
                     elif event.button == 2:
                         # suppression de la sélection
                         tile_selectionee = None
@@ -1003,9 +1723,7 @@ class Map:
                                                 pygame.quit()
                                                 sys.exit()
                                             elif clear_btn.collidepoint(event_fichier.pos):
-                                                self.map = []
-                                                self.spawn_points = []
-                                                self.event_points = []
+                                                self.__vider()
                                                 self.maj_map_image()
                                                 boucle_fichier = False
                                             elif back_btn.collidepoint(event_fichier.pos):
@@ -1079,8 +1797,6 @@ class Map:
                                 self.__add_tile(new_tile, type_tile, False)  # mise au dernier plan
                             else:
                                 self.__add_tile(new_tile, type_tile) # mise au premier plan
-
-                            self.maj_map_image()
                         # calcul du changement de position de la souris si right click + shift pressé
 
             # calcul déplacement caméra
@@ -1092,8 +1808,7 @@ class Map:
                 # si c'est négatif, ça veut dire que la souris s'est déplacée vers la gauche
                 # et gauche --> caméra +
                 #    droite --> caméra -
-                self.__camera_x = int(self.__camera_x - difference_x)
-                self.__camera_y = int(self.__camera_y - difference_y)
+                self.set_camera_pos((int(self.__camera_x - difference_x), int(self.__camera_y - difference_y)))
                 position_souris = new_position_souris
             clock_global.tick(fps)
 
@@ -0,0 +1,33 @@
+class RenderStats:
+    """
+    compteurs et temps (en secondes) mesurés par Map quand les statistiques sont activées (voir Map.set_stats())
+    les attributs du render sont ceux du dernier render(), ceux de maj_map_image sont cumulés depuis l'activation
+    """
+    def __init__(self):
+        self.renders = 0    # nombre de render() depuis l'activation
+        self.maj_map_image = 0  # nombre de maj_map_image() depuis l'activation
+        self.temps_maj_map_image = 0.0  # temps total passé dans maj_map_image()
+        self.debut_render()
+
+    def debut_render(self):
+        """
+        remet à zéro les compteurs du render (appelée au début de chaque render())
+        """
+        self.partiel = False    # True si le render() n'a redessiné que les zones modifiées
+        self.tiles_testees = 0  # tiles trouvées par l'index spatial et testées avec le champs de la caméra
+        self.tiles_ecartees = 0     # tiles testées mais hors du champs
+        self.tiles_affichees = 0    # tiles visibles dans le champs (get_tiles_on_screen())
+        self.blits_chunks = 0   # blits de la couche statique (chunks ou couche du mode défilement)
+        self.blits_animees = 0  # blits des tiles animées
+        self.blits_points = 0   # blits des spawn_points et event_points (mapmaker)
+        self.zones_redessinees = 0  # zones redessinées par le rendu partiel
+        self.temps_remplissage = 0.0    # fill du background
+        self.temps_couche_statique = 0.0    # mise à jour et blit de la couche statique
+        self.temps_tri = 0.0    # recherche dans l'index spatial et test avec le champs de la caméra
+        self.temps_tiles = 0.0  # parcours des tiles du champs (animations, positions, blits des tiles animées)
+        self.temps_points = 0.0     # spawn_points et event_points
+        self.temps_zones = 0.0  # zones redessinées par le rendu partiel
+        self.temps_total = 0.0
+
+    def get_dict(self) -> dict:
+        return dict(self.__dict__)
@@ -0,0 +1,147 @@
+"""
+format binaire des saves de map, plus compact et plus rapide à charger que le format txt de Map
+
+organisation du fichier (tout est en little-endian) :
+    - en-tête : MAGIC, version, nombre de chaînes, de chemins, de tiles, de spawn_points, d'event_points, puis l'indice du chemin_dossier et du background
+    - table des chaînes : chaque texte (id, chemin d'image, etc.) n'est écrit qu'une seule fois, sous la forme longueur + utf-8
+    - table des chemins : pour chaque chemin_image différent, le nombre d'images puis l'indice de chaque image dans la table des chaînes
+    - tiles : une colonne d'entiers par attribut (id, x_base, y_base, proportion, chemin), puis une colonne d'octets pour animated
+    - spawn_points puis event_points : une colonne d'entiers par attribut (id, x_base, y_base, largeur, hauteur)
+le fichier est lu avec mmap, et les colonnes sont copiées d'un coup dans des array (aucun découpage de texte par tile)
+
+une save est représentée par un dictionnaire :
+    - "chemin_dossier" et "background" : str
+    - "tiles" : liste de (id, x_base, y_base, animated, proportion, chemin_image), chemin_image étant un str ou une liste de str (tile animée)
+    - "spawn_points" et "event_points" : listes de (id, x_base, y_base, largeur, hauteur)
+"""
+import mmap
+import struct
+import sys
+from array import array
+
+MAGIC = b"MAPB"
+VERSION = 1
+EN_TETE = struct.Struct("<4sIIIIIIII")
+
+def _colonne(typecode, valeurs) -> bytes:
+    colonne = array(typecode, valeurs)
+    assert colonne.itemsize == 4 or typecode == "B", "les entiers doivent faire 4 octets"
+    if sys.byteorder == "big":
+        colonne.byteswap()
+    return colonne.tobytes()
+
+def _lire_colonne(typecode, donnees, position, nombre):
+    """
+    retourne la colonne de nombre entiers qui commence à position, ainsi que la position de la fin de la colonne
+    """
+    colonne = array(typecode)
+    fin = position + nombre * colonne.itemsize
+    colonne.frombytes(donnees[position:fin])
+    if sys.byteorder == "big":
+        colonne.byteswap()
+    return colonne, fin
+
+def est_binaire(nom_fichier) -> bool:
+    """
+    détermine si le fichier est une save au format binaire
+    """
+    with open(nom_fichier, "rb") as fichier:
+        return fichier.read(len(MAGIC)) == MAGIC
+
+def ecrire(nom_fichier, save:dict):
+    """
+    écrit la save (dictionnaire décrit en haut du fichier) au format binaire
+    """
+    chaines = {}    # texte -> indice dans la table des chaînes
+    chemins = {}    # tuple des indices des images -> indice dans la table des chemins
+    def indice_chaine(texte):
+        texte = str(texte)
+        if not texte in chaines:
+            chaines[texte] = len(chaines)
+        return chaines[texte]
+    def indice_chemin(chemin_image):
+        if type(chemin_image) == list:
+            cle = tuple(indice_chaine(chemin) for chemin in chemin_image)
+        else:
+            cle = (indice_chaine(chemin_image),)
+        if not cle in chemins:
+            chemins[cle] = len(chemins)
+        return chemins[cle]
+
+    indice_dossier = indice_chaine(save["chemin_dossier"])
+    indice_background = indice_chaine(save["background"])
+    tiles = save["tiles"]
+    colonnes_tiles = [[indice_chaine(tile[0]) for tile in tiles], [tile[1] for tile in tiles], [tile[2] for tile in tiles],
+                      [tile[4] for tile in tiles], [indice_chemin(tile[5]) for tile in tiles]]
+    animated = [1 if tile[3] else 0 for tile in tiles]
+    colonnes_points = []
+    for points in (save["spawn_points"], save["event_points"]):
+        colonnes_points.append([[indice_chaine(point[0]) for point in points]] + [[point[i] for point in points] for i in range(1, 5)])
+
+    morceaux = [EN_TETE.pack(MAGIC, VERSION, len(chaines), len(chemins), len(tiles), len(save["spawn_points"]), len(save["event_points"]), indice_dossier, indice_background)]
+    for texte in chaines:   # les dict gardent l'ordre d'insertion, donc l'ordre des indices
+        texte_bytes = texte.encode("utf-8")
+        morceaux.append(struct.pack("<I", len(texte_bytes)))
+        morceaux.append(texte_bytes)
+    for cle in chemins:
+        morceaux.append(_colonne("I", (len(cle),) + cle))
+    for colonne in colonnes_tiles:
+        morceaux.append(_colonne("i", colonne))
+    morceaux.append(_colonne("B", animated))
+    for colonnes in colonnes_points:
+        for colonne in colonnes:
+            morceaux.append(_colonne("i", colonne))
+    with open(nom_fichier, "wb") as fichier:
+        fichier.write(b"".join(morceaux))
+
+def lire(nom_fichier) -> dict:
+    """
+    lit une save au format binaire et retourne le dictionnaire décrit en haut du fichier
+    """
+    with open(nom_fichier, "rb") as fichier:
+        with mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ) as donnees:
+            magic, version, nb_chaines, nb_chemins, nb_tiles, nb_spawn, nb_event, indice_dossier, indice_background = EN_TETE.unpack_from(donnees, 0)
+            assert magic == MAGIC, "le fichier n'est pas une save binaire"
+            assert version == VERSION, "version de save binaire inconnue : " + str(version)
+            position = EN_TETE.size
+
+            chaines = []
+            for i in range(nb_chaines):
+                longueur = struct.unpack_from("<I", donnees, position)[0]
+                position = position + 4
+                chaines.append(donnees[position:position + longueur].decode("utf-8"))
+                position = position + longueur
+
+            chemins = []
+            for i in range(nb_chemins):
+                nb_images = struct.unpack_from("<I", donnees, position)[0]
+                indices, position = _lire_colonne("I", donnees, position + 4, nb_images)
+                if nb_images == 1:
+                    chemins.append(chaines[indices[0]])
+                else:
+                    chemins.append([chaines[indice] for indice in indices])
+
+            colonnes = []
+            for i in range(5):
+                colonne, position = _lire_colonne("i", donnees, position, nb_tiles)
+                colonnes.append(colonne)
+            animated, position = _lire_colonne("B", donnees, position, nb_tiles)
+            ids, xs, ys, proportions, indices_chemins = colonnes
+            tiles = []
+            for i in range(nb_tiles):
+                chemin_image = chemins[indices_chemins[i]]
+                if type(chemin_image) == list:
+                    chemin_image = list(chemin_image)   # chaque tile animée a sa propre liste (elle est triée par Tile.charger_image())
+                tiles.append((chaines[ids[i]], xs[i], ys[i], animated[i] == 1, proportions[i], chemin_image))
+
+            listes_points = []
+            for nombre in (nb_spawn, nb_event):
+                colonnes = []
+                for i in range(5):
+                    colonne, position = _lire_colonne("i", donnees, position, nombre)
+                    colonnes.append(colonne)
+                ids, xs, ys, largeurs, hauteurs = colonnes
+                listes_points.append([(chaines[ids[i]], xs[i], ys[i], largeurs[i], hauteurs[i]) for i in range(nombre)])
+
+    return {"chemin_dossier": chaines[indice_dossier], "background": chaines[indice_background],
+            "tiles": tiles, "spawn_points": listes_points[0], "event_points": listes_points[1]}
@@ -1,4 +1,6 @@
 import pygame
+import math
+from Snapshots import Snapshots
 pygame.init()
 
 class Screen:
@@ -14,7 +16,9 @@ class Screen:
         self.screen_calcul = pygame.surface.Surface(dimensions_calcul)
         self.dimensions_screen_calcul = dimensions_calcul
         self.screen = None
-        self.saves = {}
+        self.saves = Snapshots()    # sauvegardes du screen de calcul, avec un budget en octets
+        self.surface_echelle = None     # surface réutilisée pour la mise à l'échelle du screen de calcul
+        self.lissage = True     # True : mise à l'échelle lissée (smoothscale), False : pixels les plus proches (scale, plus rapide)
 
     def set_mode(self, dimensions, flag=None):
         """
@@ -28,6 +32,37 @@ class Screen:
             self.screen = pygame.display.set_mode(dimensions)
         self.dimensions_screen = dimensions
 
+    def set_lissage(self, lissage:bool):
+        """
+        True : la mise à l'échelle lors de flip() est lissée (smoothscale, par défaut)
+        False : la mise à l'échelle prend les pixels les plus proches (scale, plus rapide, rendu pixelisé)
+        """
+        assert type(lissage) == bool, "lissage doit être un booléen"
+        self.lissage = lissage
+
+    def __get_dimensions_affichage(self) -> tuple:
+        # la surface d'affichage suit les redimensionnements de la fenêtre : sa taille est toujours à jour (pas besoin de display.Info())
+        self.screen = pygame.display.get_surface()
+        return self.screen.get_size()
+
+    def __mettre_echelle(self, surface, dimensions, destination=None):
+        # pygame refuse destination=None : elle n'est passée que si elle existe
+        if destination == None:
+            if self.lissage:
+                return pygame.transform.smoothscale(surface, dimensions)
+            return pygame.transform.scale(surface, dimensions)
+        if self.lissage:
+            return pygame.transform.smoothscale(surface, dimensions, destination)
+        return pygame.transform.scale(surface, dimensions, destination)
+
+    def __lissage_decoupable(self, taille_calcul:int, taille_affichage:int) -> bool:
+        """
+        True si smoothscale d'une partie alignée sur la grille de l'échelle donne les mêmes pixels que smoothscale de tout le screen sur cet axe :
+        c'est le cas quand l'image est réduite et que le pas de smoothscale (0x10000 * taille_calcul / taille_affichage) est entier
+        (sinon l'erreur d'arrondi du pas s'accumule depuis le bord de l'image, et l'agrandissement dépend de la taille de l'image)
+        """
+        return taille_affichage <= taille_calcul and (0x10000 * taille_calcul) % taille_affichage == 0
+
     def blit(self, surface, cos):
         self.screen_calcul.blit(surface, cos)
 
@@ -37,38 +72,133 @@ class Screen:
     def fill(self, color):
         self.screen_calcul.fill(color)
 
-    def flip(self):
+    def flip(self, rects=None):
         """
         équivalent de pygame.display.flip()
+        si une liste de rects du screen de calcul est passée en paramètre (par exemple celle retournée par Map.render()),
+        seules ces zones sont mises à l'échelle et mises à jour sur l'affichage (équivalent de pygame.display.update(rects))
+        les zones sont agrandies jusqu'à la grille de l'échelle, pour avoir les mêmes pixels qu'avec flip() sans rects (pas de démarcation autour des zones)
+        si l'affichage a la même taille que le screen de calcul, il n'y a pas de mise à l'échelle
         """
-        infos = pygame.display.Info()
-        self.screen.blit(pygame.transform.smoothscale(self.screen_calcul, (infos.current_w, infos.current_h)), (0,0))
-        pygame.display.flip()
+        largeur, hauteur = self.__get_dimensions_affichage()
+        meme_taille = (largeur, hauteur) == self.dimensions_screen_calcul
+        if rects == None:
+            if meme_taille:
+                self.screen.blit(self.screen_calcul, (0,0))
+            else:
+                if self.surface_echelle == None or self.surface_echelle.get_size() != (largeur, hauteur):
+                    self.surface_echelle = pygame.surface.Surface((largeur, hauteur), 0, self.screen_calcul)
+                self.__mettre_echelle(self.screen_calcul, (largeur, hauteur), self.surface_echelle)
+                self.screen.blit(self.surface_echelle, (0,0))
+            pygame.display.flip()
+            return
+        if meme_taille:
+            rects_affichage = []
+            for rect in rects:
+                rect = pygame.rect.Rect(rect).clip(self.screen_calcul.get_rect())
+                if rect.width > 0 and rect.height > 0:
+                    self.screen.blit(self.screen_calcul, rect, rect)
+                    rects_affichage.append(rect)
+            pygame.display.update(rects_affichage)
+            return
+        largeur_calcul, hauteur_calcul = self.dimensions_screen_calcul
+        if self.surface_echelle == None or self.surface_echelle.get_size() != (largeur, hauteur):
+            # pas encore d'image mise à l'échelle de cette taille : tout est mis à l'échelle
+            self.flip()
+            return
+        if self.lissage and not (self.__lissage_decoupable(largeur_calcul, largeur) and self.__lissage_decoupable(hauteur_calcul, hauteur)):
+            # le lissage d'une partie ne donnerait pas les mêmes pixels : tout est mis à l'échelle, mais seules les zones sont mises à jour
+            self.__mettre_echelle(self.screen_calcul, (largeur, hauteur), self.surface_echelle)
+            rects_affichage = []
+            for rect in rects:
+                rect = pygame.rect.Rect(rect).clip(self.screen_calcul.get_rect())
+                if rect.width == 0 or rect.height == 0:
+                    continue
+                # un pixel de marge : lors d'un agrandissement, les pixels voisins sont mélangés avec ceux du rect
+                rect = rect.inflate(2, 2).clip(self.screen_calcul.get_rect())
+                x1 = rect.left * largeur // largeur_calcul
+                y1 = rect.top * hauteur // hauteur_calcul
+                x2 = -(-rect.right * largeur // largeur_calcul)
+                y2 = -(-rect.bottom * hauteur // hauteur_calcul)
+                interieur = pygame.rect.Rect(x1, y1, x2 - x1, y2 - y1)
+                self.screen.blit(self.surface_echelle, interieur, interieur)
+                rects_affichage.append(interieur)
+            pygame.display.update(rects_affichage)
+            return
+        # les rects sont agrandis jusqu'à la grille de l'échelle (pas_x pixels du screen de calcul = pas_affichage_x pixels de l'affichage),
+        # pour que leurs bords tombent sur des pixels entiers de l'affichage : les pixels sont alors les mêmes qu'avec une mise à l'échelle de tout le screen
+        pgcd_x = math.gcd(largeur_calcul, largeur)
+        pgcd_y = math.gcd(hauteur_calcul, hauteur)
+        pas_x = largeur_calcul // pgcd_x
+        pas_y = hauteur_calcul // pgcd_y
+        pas_affichage_x = largeur // pgcd_x
+        pas_affichage_y = hauteur // pgcd_y
+        rects_affichage = []
+        for rect in rects:
+            rect = pygame.rect.Rect(rect).clip(self.screen_calcul.get_rect())
+            if rect.width == 0 or rect.height == 0:
+                continue
+            # intérieur (affiché) et zone mise à l'échelle (avec une marge d'un pas, pour le lissage des bords), en nombre de pas
+            x1 = rect.left // pas_x
+            y1 = rect.top // pas_y
+            x2 = -(-rect.right // pas_x)
+            y2 = -(-rect.bottom // pas_y)
+            marge_x1 = max(x1 - 1, 0)
+            marge_y1 = max(y1 - 1, 0)
+            marge_x2 = min(x2 + 1, pgcd_x)
+            marge_y2 = min(y2 + 1, pgcd_y)
+            source = pygame.rect.Rect(marge_x1 * pas_x, marge_y1 * pas_y, (marge_x2 - marge_x1) * pas_x, (marge_y2 - marge_y1) * pas_y)
+            destination = pygame.rect.Rect(marge_x1 * pas_affichage_x, marge_y1 * pas_affichage_y,
+                                           (marge_x2 - marge_x1) * pas_affichage_x, (marge_y2 - marge_y1) * pas_affichage_y)
+            self.__mettre_echelle(self.screen_calcul.subsurface(source), destination.size, self.surface_echelle.subsurface(destination))
+            interieur = pygame.rect.Rect(x1 * pas_affichage_x, y1 * pas_affichage_y, (x2 - x1) * pas_affichage_x, (y2 - y1) * pas_affichage_y)
+            self.screen.blit(self.surface_echelle, interieur, interieur)
+            rects_affichage.append(interieur)
+        pygame.display.update(rects_affichage)
 
     def get_calcul_mouse_cos(self, mouse_cos):
         """
         IMPORTANT : permet d'obtenir les coordonnées de la souris par rapport au screen de calcul
         prend en paramètre les coordonnées de la souris sur le screen d'affichage
         """
-        infos = pygame.display.Info()
-        mouse_x = int(mouse_cos[0] / infos.current_w * self.dimensions_screen_calcul[0])
-        mouse_y = int(mouse_cos[1] / infos.current_h * self.dimensions_screen_calcul[1])
+        largeur, hauteur = self.__get_dimensions_affichage()
+        mouse_x = int(mouse_cos[0] / largeur * self.dimensions_screen_calcul[0])
+        mouse_y = int(mouse_cos[1] / hauteur * self.dimensions_screen_calcul[1])
         return (mouse_x, mouse_y)
 
     def save_screen(self, id):
         """
         sauvegarde le screen de calcul actuel
+        si le budget des sauvegardes est dépassé, les sauvegardes les moins récemment utilisées sont compressées (voir set_compression_saves()) ou supprimées
         """
-        self.saves[id] = self.screen_calcul.copy()
+        self.saves.ajouter(id, self.screen_calcul)
 
     def del_save(self, id):
-        self.saves.pop(id)
+        self.saves.supprimer(id)
 
     def load_screen(self, id):
         """
-        attention : une nouvelle instance est crée lors du chargement (le fait de blit des trucs sur l'image ne changera pas la save)
+        la sauvegarde est blitée sur le screen de calcul actuel (blit des trucs sur le screen de calcul ne changera pas la save)
+        """
+        self.saves.charger(id, self.screen_calcul)
+
+    def set_budget_saves(self, budget:int):
+        """
+        définit la mémoire maximale (en octets) utilisée par les sauvegardes du screen de calcul (256 Mo par défaut)
+        """
+        self.saves.set_budget(budget)
+
+    def set_compression_saves(self, compression:bool):
+        """
+        si True, quand le budget est dépassé, les sauvegardes les moins récemment utilisées sont compressées (zlib) avant d'être supprimées
+        """
+        self.saves.set_compression(compression)
+
+    def compresser_saves(self):
+        """
+        compresse toutes les sauvegardes (par exemple quand elles ne servent plus pour le moment), elles restent utilisables avec load_screen()
         """
-        self.screen_calcul = self.saves[id].copy()
+        self.saves.compresser()
 
 resize_screen = Screen((1920, 1080))
 # pour blit un truc : resize_screen.blit(element, coordonnées)
@@ -0,0 +1,113 @@
+import zlib
+from collections import OrderedDict
+import pygame
+
+class Snapshots:
+    """
+    sauvegardes de surfaces (utilisées par Screen.save_screen() et Screen.load_screen())
+    la mémoire utilisée est limitée par un budget en octets : quand il est dépassé, les sauvegardes les moins récemment utilisées
+    sont compressées (si la compression est activée), puis supprimées si ça ne suffit pas
+    une sauvegarde compressée est gardée sous forme d'octets (tobytes() passé dans zlib), elle est décompressée lors du chargement
+    classe utilisée par Screen, elle ne doit pas être utilisée directement
+    """
+    def __init__(self, budget=256*1024*1024, compression=False):
+        self.budget = budget    # mémoire maximale en octets
+        self.compression = compression  # si True, les sauvegardes sont compressées avant d'être supprimées
+        self.saves = OrderedDict()  # id -> Surface, ou (octets compressés, taille, format) si compressée, de la moins récemment utilisée à la plus récemment utilisée
+        self.octets = 0
+        self.suppressions = 0   # nombre de sauvegardes supprimées à cause du budget
+
+    def __len__(self):
+        return len(self.saves)
+
+    def __contains__(self, id):
+        return id in self.saves
+
+    def __taille(self, save) -> int:
+        if type(save) == tuple:
+            return len(save[0])
+        return save.get_width() * save.get_height() * save.get_bytesize()
+
+    def __format(self, surface) -> str:
+        if surface.get_flags() & pygame.SRCALPHA:
+            return "RGBA"
+        return "RGB"
+
+    def ajouter(self, id, surface):
+        """
+        sauvegarde une copie de la surface, puis libère de la mémoire si le budget est dépassé
+        """
+        self.supprimer(id)
+        save = surface.copy()
+        self.saves[id] = save
+        self.octets = self.octets + self.__taille(save)
+        self.__liberer(id)
+
+    def supprimer(self, id):
+        """
+        supprime la sauvegarde (ne fait rien si elle n'existe pas)
+        """
+        save = self.saves.pop(id, None)
+        if save != None:
+            self.octets = self.octets - self.__taille(save)
+
+    def charger(self, id, destination):
+        """
+        blit la sauvegarde sur destination (aucune nouvelle surface n'est gardée, la sauvegarde n'est pas modifiée)
+        """
+        assert id in self.saves, "sauvegarde inconnue (jamais faite, ou supprimée à cause du budget) : " + str(id)
+        self.saves.move_to_end(id)
+        save = self.saves[id]
+        if type(save) == tuple:
+            octets, taille, format = save
+            destination.blit(pygame.image.frombytes(zlib.decompress(octets), taille, format), (0, 0))
+        else:
+            destination.blit(save, (0, 0))
+
+    def compresser(self, id=None):
+        """
+        compresse la sauvegarde id, ou toutes les sauvegardes si id = None (par exemple à la fin d'une animation, quand elles ne servent plus pour le moment)
+        """
+        if id == None:
+            ids = list(self.saves)
+        else:
+            ids = [id]
+        for id in ids:
+            save = self.saves[id]
+            if type(save) != tuple:
+                format = self.__format(save)
+                compressee = (zlib.compress(pygame.image.tobytes(save, format), 1), save.get_size(), format)
+                self.saves[id] = compressee
+                self.octets = self.octets - self.__taille(save) + self.__taille(compressee)
+
+    def __liberer(self, garder=None):
+        """
+        tant que le budget est dépassé, compresse (si la compression est activée) puis supprime les sauvegardes les moins récemment utilisées
+        la sauvegarde garder n'est jamais supprimée
+        """
+        if self.compression:
+            for id in list(self.saves):
+                if self.octets <= self.budget:
+                    return
+                if id != garder:
+                    self.compresser(id)
+        for id in list(self.saves):
+            if self.octets <= self.budget:
+                return
+            if id != garder:
+                self.supprimer(id)
+                self.suppressions = self.suppressions + 1
+
+    def set_budget(self, budget:int):
+        assert type(budget) == int and budget >= 0, "le budget doit être un entier positif (en octets)"
+        self.budget = budget
+        self.__liberer()
+
+    def set_compression(self, compression:bool):
+        assert type(compression) == bool, "compression doit être un booléen"
+        self.compression = compression
+        self.__liberer()
+
+    def get_stats(self) -> dict:
+        compressees = len([save for save in self.saves.values() if type(save) == tuple])
+        return {"saves": len(self.saves), "compressees": compressees, "suppressions": self.suppressions, "octets": self.octets}
@@ -1,6 +1,63 @@
 import pygame
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from ImageCache import ImageCache
+from Animation import Animation
+from TileType import TileType
 pygame.init()
-dico_image = {}
+cache_image = ImageCache()  # images de base (clé : chemin) et images mises à l'échelle (clé : (chemin, largeur, hauteur)), partagées par toutes les tiles
+dico_animations = weakref.WeakValueDictionary()     # tuple des clés des frames -> Animation partagée, supprimée quand plus aucune tile ne l'utilise
+dico_modeles = weakref.WeakValueDictionary()    # (chemin(s), proportion, largeur, hauteur) -> TileType partagé, supprimé quand plus aucune tile ne l'utilise
+dico_masques = weakref.WeakKeyDictionary()  # image -> masque de collision, partagé par toutes les tiles qui ont la même image, supprimé avec l'image
+
+def precharger_images(demandes, nb_threads=None) -> list:
+    """
+    charge à l'avance et en parallèle les images dont les tiles auront besoin, pour que Tile.charger_image() les trouve dans cache_image
+    demandes est une liste de (tile, largeur, hauteur), avec les largeur et hauteur qui seront passées à charger_image() (None pour la proportion)
+    les images sont décodées puis mises à l'échelle dans des threads, seul convert_alpha() est fait dans le thread principal (il a besoin de l'affichage)
+    les images sont ajoutées au cache dans l'ordre des demandes, le résultat ne dépend donc pas de l'ordre de fin des threads
+    retourne la liste des images chargées : elle doit être gardée jusqu'à la fin des charger_image(),
+    sinon le cache peut supprimer les images préchargées (qui ne sont utilisées par aucune tile) s'il dépasse son budget
+    """
+    with ThreadPoolExecutor(nb_threads) as threads:
+        # images de base
+        chemins = {}    # dict utilisé comme un set ordonné
+        for tile, largeur, hauteur in demandes:
+            if type(tile.chemin_image) == list:
+                liste_chemins = tile.chemin_image
+            else:
+                liste_chemins = [tile.chemin_image]
+            for chemin in liste_chemins:
+                if not chemin in cache_image:
+                    chemins[chemin] = None
+        images_base = {}
+        for chemin, image in zip(chemins, threads.map(pygame.image.load, chemins)):
+            images_base[chemin] = image.convert_alpha()
+            cache_image.ajouter(chemin, images_base[chemin])
+
+        # images mises à l'échelle
+        cles = {}
+        deja_vues = set()   # les tiles avec les mêmes images, proportion et dimensions ont les mêmes clés
+        for tile, largeur, hauteur in demandes:
+            if type(tile.chemin_image) == list:
+                demande = (tuple(tile.chemin_image), tile.proportion, largeur, hauteur)
+            else:
+                demande = (tile.chemin_image, tile.proportion, largeur, hauteur)
+            if demande in deja_vues:
+                continue
+            deja_vues.add(demande)
+            for cle in tile.get_cles_images(largeur, hauteur):
+                if type(cle) == tuple and not cle in cache_image:
+                    if not cle[0] in images_base:
+                        images_base[cle[0]] = tile.load_dico(cle[0])
+                    cles[cle] = None
+        mises_a_echelle = threads.map(lambda cle: pygame.transform.scale(images_base[cle[0]], (cle[1], cle[2])), cles)
+        images_echelle = []
+        for cle, image in zip(cles, mises_a_echelle):
+            cache_image.ajouter(cle, image)
+            images_echelle.append(image)
+    return list(images_base.values()) + images_echelle
+
 class Tile:
     """
     classe représentant un élément de la map
@@ -8,6 +65,7 @@ class Tile:
         - Tile.get_id() et Tile.set_id() pour avoir et définir l'id de la tile
           l'id par défaut de la tile est l'id défini dans le mapmaker
         - Tile.set_visible() et get_visible() pour activer, désactiver ou obtenir le fait que la tile soit affichée lors de Map.render()
+          seule la zone de la tile est redessinée lors du prochain Map.render() (pas besoin de Map.maj_map_image())
           si la tile est invisible, elle ne sera pas dans Map.get_tiles_on_screen, mais elle sera dans get_all_tiles() et get_invisible_tiles()
           attention : dans la classe Map, self.visible n'est pas sauvegardé, lors du lancement de la map, toutes les tiles seront visibles (sauf les spawn points et les event points)
         - get_tile_rect() qui permet d'avoir le rect de la tile, si elle est animée, le rect est celle de la frame actuelle
@@ -15,6 +73,7 @@ class Tile:
         - Tile.get_co() et Tile.get_co_base(), je ne conseille pas vraiment de les utiliser parce que c'est compliqué, mais en gros:
           get_co_base() fait référence aux coordonnées de la tile sur la map si on ne prend pas en compte la caméra
           get_co() fait référence aux coordonnées d'affichage de la tile sur l'écran (en prenant en compte la caméra), cette méthode se met à jour avec Map.render()
+        - Tile.set_co_base() pour déplacer la tile sur la map, seule la zone modifiée est redessinée lors du prochain Map.render()
     dans le cas d'une tile animée :
         - Tile.get_animated pour savoir si la tile est animée ou pas
         - Tile.get_actual_frame() qui retourne l'indice de la frame actuelle (0 pour la première frame)
@@ -22,28 +81,64 @@ class Tile:
         - Tile.previous_frame() pour passer à la frame précédente lors de Map.render(), le rect sera mis à jour
         - Tile.set_frame() pour passer à la frame d'indice passé en paramètre lors de Map.render(), le rect sera mis à jour
     le reste des méthodes nécessaires pour la classe Map, mais ne doivent pas être utilisées
+    pour prendre peu de place en mémoire (maps avec beaucoup de tiles), la tile utilise __slots__ (pas d'attribut en plus possible),
+    les données d'affichage partagées sont dans un TileType, et le rect n'est créé que quand il est demandé
     """
+    __slots__ = ("id", "x_base", "y_base", "actual_frame", "chemin_image", "image", "proportion", "x", "y", "visible", "proprietaire", "modele", "__rect")
+
     def __init__(self, co_de_base=(0,0)):
         self.id = ""
         # x et y de départ, à sauvegarder
         self.x_base = co_de_base[0]
         self.y_base = co_de_base[1]
 
-        self.animated = False   # détermine si la tile a une animation
         self.actual_frame = 0   # frame de l'animation, 0 est la première image
-        self.liste_frames = []  # ensemble des images de l'animation
 
         self.chemin_image = None    # liste de str ou str (animations ou pas)
         self.image = None   # image actuelle si animation
 
         self.proportion = 100   # en %
 
-        self.rect = None
+        self.modele = None  # TileType partagé (images, frames, animated), mis en place par charger_image()
+        self.__rect = None  # créé seulement lors de get_tile_rect()
 
         # x et y variables (selon la caméra)
         self.x = co_de_base[0]
         self.y = co_de_base[1]
         self.visible = True  # détermine si la tile doit s'afficher (son rect ne sera pas dans Map.rects_on_screen)
+        self.proprietaire = None    # Map qui contient la tile, prévenue quand la position ou la visibilité change
+
+    # données partagées, dans le TileType de la tile
+    @property
+    def animated(self) -> bool:
+        """
+        détermine si la tile a une animation
+        """
+        if self.modele == None:
+            return False
+        return self.modele.animated
+
+    @property
+    def liste_frames(self) -> list:
+        """
+        ensemble des images de l'animation (partagé avec les tiles qui ont la même animation, ne doit pas être modifié)
+        """
+        if self.modele == None:
+            return []
+        return self.modele.liste_frames
+
+    @property
+    def animation(self):
+        """
+        Animation partagée par les tiles qui ont les mêmes frames
+        """
+        if self.modele == None:
+            return None
+        return self.modele.animation
+
+    @property
+    def rect(self):
+        return self.get_tile_rect()
 
     # getters
     def get_id(self):
@@ -66,18 +161,52 @@ class Tile:
         if self.animated:
             return self.actual_frame
     def get_tile_rect(self):
-        return self.rect
+        """
+        le rect est créé lors du premier appel après maj_rect() (pas de rect créé pour les tiles dont on ne demande pas le rect)
+        """
+        if self.__rect == None and self.image != None:
+            self.__rect = pygame.rect.Rect(self.x, self.y, self.image.get_width(), self.image.get_height())
+        return self.__rect
     def get_visible(self) -> bool:
         return self.visible
+    def get_masque(self):
+        """
+        retourne le masque de collision (pygame.mask.Mask) de l'image actuelle (frame actuelle si animée)
+        le masque n'est calculé qu'une fois par image, et il est partagé par toutes les tiles qui ont la même image (même chemin et même taille)
+        """
+        masque = dico_masques.get(self.image)
+        if masque == None:
+            masque = pygame.mask.from_surface(self.image)
+            dico_masques[self.image] = masque
+        return masque
 
     # setters
     def set_id(self, new_id:str):
+        ancien_id = self.id
         self.id = new_id
+        if self.proprietaire != None and ancien_id != new_id:
+            self.proprietaire.maj_id_tile(self, ancien_id)
 
     # important
     def set_visible(self, visible:bool):
         assert type(visible) == bool, "visible doit être un booléen"
+        if visible == self.visible:
+            return
         self.visible = visible
+        if self.proprietaire != None:
+            self.proprietaire.maj_tile(self)
+
+    def set_co_base(self, co_base:tuple):
+        """
+        déplace la tile sur la map (coordonnées sans prendre en compte la caméra)
+        le visuel est mis à jour lors du prochain Map.render(), get_co() et get_tile_rect() aussi
+        """
+        assert type(co_base) == tuple, "co_base doit être un tuple"
+        assert type(co_base[0]) == int and type(co_base[1]) == int, "les éléments de co_base doivent être des entiers"
+        self.x_base = co_base[0]
+        self.y_base = co_base[1]
+        if self.proprietaire != None:
+            self.proprietaire.maj_tile(self)
 
     def next_frame(self):
         """
@@ -128,61 +257,98 @@ class Tile:
         si tile animée, le rect est de la taille de la frame actuelle
         """
         assert type(self.image) == pygame.Surface, "l'image n'est pas valide ou pas encore chargée"
-        self.rect = self.image.get_rect()   # même chose que ce soit animé ou pas
-        self.rect.x = self.x
-        self.rect.y = self.y
+        self.__rect = None  # le rect sera recréé à partir de self.image, self.x et self.y lors du prochain get_tile_rect()
 
     def load_dico(self, chemin_image:str):
         """
         Permet d'économiser de la place en mémoire
         """
-        if not chemin_image in dico_image:
-            dico_image[chemin_image] = pygame.image.load(chemin_image).convert_alpha()
-        return dico_image[chemin_image]
+        image = cache_image.get(chemin_image)
+        if image == None:
+            image = pygame.image.load(chemin_image).convert_alpha()
+            cache_image.ajouter(chemin_image, image)
+        return image
 
-    def charger_image(self, largeur=None, hauteur=None):    # largeur et hauteur personnalisée
+    def load_dico_echelle(self, chemin_image:str, largeur:int, hauteur:int):
         """
-        charge/met à jour l'image grâce à self.chemin_image, puis le met à la bonne proportion grâce à self.proportion
-        si une largeur ou une hauteur est passée en paramètre, elles seront utilisées à la place de la proportion
-        si animée, l'image mise est la première frame
+        retourne l'image mise aux dimensions passées en paramètre
+        l'image n'est mise à l'échelle qu'une seule fois pour toutes les tiles qui ont la même image et les mêmes dimensions
+        ATTENTION : l'image retournée est partagée, elle ne doit pas être modifiée (set_alpha, blit, etc.)
         """
-        self.image = None
-        self.liste_frames = []
+        cle = (chemin_image, largeur, hauteur)
+        image = cache_image.get(cle)
+        if image == None:
+            image = pygame.transform.scale(self.load_dico(chemin_image), (largeur, hauteur))
+            cache_image.ajouter(cle, image)
+        return image
 
+    def get_cles_images(self, largeur=None, hauteur=None) -> list:
+        """
+        retourne, pour chaque image de la tile (chaque frame si animée), la clé de l'image à afficher dans cache_image :
+        (chemin, largeur, hauteur) pour une image mise à l'échelle, ou le chemin seul si l'image est trop petite pour être mise à l'échelle
+        largeur et hauteur ont le même rôle que dans charger_image() (si animée, la proportion est calculée avec la première frame)
+        """
         if type(self.chemin_image) == list:
-            # animé
-            self.animated = True
             self.chemin_image.sort()    # triage des animations
-            for chemin in self.chemin_image:
-                image = self.load_dico(chemin)
-                if largeur == None:
-                    largeur = int(image.get_size()[0]*(self.proportion/100))
-                if hauteur == None:
-                    hauteur = int(image.get_size()[1]*(self.proportion/100))
-
-                if hauteur == 0 or largeur == 0:
-                    print("trop petit")
-                else:
-                    image = pygame.transform.scale(image, (largeur, hauteur))
-                self.liste_frames.append(image)
-            self.image = self.liste_frames[0]   # image de base
-            self.maj_rect()     # génération du rect
+            chemins = self.chemin_image
         else:
-            # pas animé
-            self.animated = False
-            self.image = self.load_dico(self.chemin_image)
+            chemins = [self.chemin_image]
+        cles = []
+        for chemin in chemins:
+            image = self.load_dico(chemin)
             # ATTENTION : si largeur ou hauteur = 0, le truc pour le quadrillage va faire une boucle infinie
             if largeur == None:
-                largeur = int(self.image.get_size()[0]*(self.proportion/100))
+                largeur = int(image.get_size()[0]*(self.proportion/100))
             if hauteur == None:
-                hauteur = int(self.image.get_size()[1]*(self.proportion/100))
+                hauteur = int(image.get_size()[1]*(self.proportion/100))
 
             if hauteur == 0 or largeur == 0:
-                print("trop petit")
+                cles.append(chemin)
             else:
-                self.image = pygame.transform.scale(self.image, (largeur, hauteur))
+                cles.append((chemin, largeur, hauteur))
                 # TypeError: size must be two numbers = nombre trop grand
-            self.maj_rect()     # génération du rect
+        return cles
+
+    def charger_image(self, largeur=None, hauteur=None):    # largeur et hauteur personnalisée
+        """
+        charge/met à jour l'image grâce à self.chemin_image, puis le met à la bonne proportion grâce à self.proportion
+        si une largeur ou une hauteur est passée en paramètre, elles seront utilisées à la place de la proportion
+        si animée, l'image mise est la première frame
+        """
+        self.image = None
+        self.modele = None
+
+        if type(self.chemin_image) == list:
+            cle_modele = (tuple(sorted(self.chemin_image)), self.proportion, largeur, hauteur)
+        else:
+            cle_modele = (self.chemin_image, self.proportion, largeur, hauteur)
+        modele = dico_modeles.get(cle_modele)
+        if modele == None:
+            cles = self.get_cles_images(largeur, hauteur)
+            if type(self.chemin_image) == list:
+                # animé : les frames sont partagées avec les tiles qui ont la même animation aux mêmes dimensions
+                animation = dico_animations.get(tuple(cles))
+                if animation == None:
+                    animation = Animation(tuple(self.chemin_image), [self.__load_cle(cle) for cle in cles])
+                    dico_animations[tuple(cles)] = animation
+                modele = TileType(list(self.chemin_image), self.proportion, animation.frames[0], animation.frames, animation)   # image de base : première frame
+            else:
+                # pas animé
+                modele = TileType(self.chemin_image, self.proportion, self.__load_cle(cles[0]), [], None)
+            dico_modeles[cle_modele] = modele
+        self.modele = modele
+        self.chemin_image = modele.chemin_image     # chemins partagés avec les tiles du même TileType (pas une copie par tile)
+        self.image = modele.image
+        self.maj_rect()     # génération du rect
+
+    def __load_cle(self, cle):
+        """
+        retourne l'image correspondant à une clé retournée par get_cles_images()
+        """
+        if type(cle) == tuple:
+            return self.load_dico_echelle(*cle)
+        print("trop petit")
+        return self.load_dico(cle)
 
     def affiche_tile(self):
         print(self.id, self.x_base, self.y_base, self.animated, self.proportion, self.chemin_image)
@@ -198,18 +364,17 @@ class Tile:
         tile.x_base = self.x_base
         tile.y_base = self.y_base
 
-        tile.animated = self.animated
         tile.actual_frame = self.actual_frame
-        tile.liste_frames = self.liste_frames
 
         tile.chemin_image = self.chemin_image
         tile.image = self.image
 
         tile.proportion = self.proportion
 
-        tile.rect = self.rect
+        tile.modele = self.modele
+        tile.__rect = self.__rect
 
         tile.x = self.x
         tile.y = self.y
         tile.visible = self.visible
-        return tile
\ No newline at end of file
+        return tile
@@ -0,0 +1,15 @@
+class TileType:
+    """
+    données d'affichage partagées (flyweight) par toutes les tiles qui ont les mêmes images, la même proportion et les mêmes dimensions
+    une tile ne garde que ce qui lui est propre (id, positions, visibilité, frame actuelle) et une référence vers son TileType
+    classe utilisée par Tile, elle ne doit pas être utilisée directement
+    """
+    __slots__ = ("chemin_image", "proportion", "animated", "image", "liste_frames", "animation", "__weakref__")
+
+    def __init__(self, chemin_image, proportion:int, image, liste_frames:list, animation):
+        self.chemin_image = chemin_image    # str, ou liste de str triée si animée (ne doit pas être modifiée)
+        self.proportion = proportion
+        self.animated = type(chemin_image) == list
+        self.image = image  # image si pas animée, première frame sinon
+        self.liste_frames = liste_frames    # frames de l'animation (vide si pas animée)
+        self.animation = animation  # Animation partagée si animée, None sinon
@@ -0,0 +1,202 @@
+"""
+benchmarks du moteur de map, sans fenêtre (avec le driver vidéo dummy de SDL)
+pour chaque taille, une map synthétique est générée dans un dossier temporaire (images + save binaire), puis sont mesurés :
+    - charger_binaire : Map.charger_map() de la save binaire
+    - save_texte : sauvegarde de la map au format txt (celui du mapmaker)
+    - charger_texte : Map.charger_map() de la save txt
+    - render_fixe : un render() avec la caméra immobile (animations automatiques activées)
+    - render_defilement : un render() avec la caméra qui avance de 3 pixels par image
+    - render_fixe_partiel : comme render_fixe, avec le rendu partiel (Map.set_rendu_partiel(True)) : seules les tiles animées sont redessinées
+    - render_defilement_couche : comme render_defilement, avec le mode défilement (Map.set_defilement(True)) : la couche statique est décalée
+    - maj_map_image : Map.maj_map_image() suivi du render() qui recrée les chunks du champs
+pour chaque mesure : le temps (en secondes, le meilleur des répétitions) et le pic de mémoire python (mesuré avec tracemalloc, lors d'une exécution à part)
+les pixels des images et des chunks sont alloués par SDL, ils ne sont pas comptés dans la mémoire
+octets_par_tile est la mémoire python gardée par tile après le chargement de la save binaire
+
+utilisation :
+    python bench.py    (1000, 10000 et 100000 tiles)
+    python bench.py --tailles 1000 1000000 --animees 0.2 --etalement 3 --json resultats.json
+    python bench.py --reference resultats.json    (compare avec une exécution précédente, retourne 1 si une mesure est plus lente que le seuil)
+"""
+import os
+import sys
+import gc
+import json
+import time
+import argparse
+import platform
+import tempfile
+import tracemalloc
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+import SaveBinaire
+from Map import Map
+
+DIMENSIONS = (1320, 1080)   # dimensions d'affichage de la map (celles du mapmaker)
+
+def generer_map(dossier, nb_tiles:int, proportion_animee=0.05, etalement=1, nb_images=16, taille_image=32) -> str:
+    """
+    crée nb_images images dans dossier et une save binaire de nb_tiles tiles rangées en grille carrée, retourne le chemin de la save
+    proportion_animee : proportion des tiles qui sont animées (avec 4 frames), entre 0 et 1
+    etalement : distance entre deux tiles, en nombre de tiles (1 : les tiles se touchent, 4 : une tile toutes les 4 cases)
+    """
+    assert 0 <= proportion_animee <= 1, "proportion_animee doit être entre 0 et 1"
+    assert type(etalement) == int and etalement >= 1, "etalement doit être un entier positif"
+    chemins = []
+    for i in range(nb_images):
+        image = pygame.surface.Surface((taille_image, taille_image))
+        image.fill(((i * 53) % 256, (i * 97) % 256, (i * 151) % 256))
+        chemin = os.path.join(dossier, "tile" + str(i) + ".png")
+        pygame.image.save(image, chemin)
+        chemins.append(chemin)
+    colonnes = int(nb_tiles ** 0.5) + 1
+    tiles = []
+    nb_animees = 0
+    for i in range(nb_tiles):
+        x = (i % colonnes) * taille_image * etalement
+        y = (i // colonnes) * taille_image * etalement
+        if nb_animees < (i + 1) * proportion_animee:
+            # tiles animées réparties régulièrement dans la map
+            nb_animees = nb_animees + 1
+            tiles.append(("", x, y, True, 100, [chemins[(i + frame) % nb_images] for frame in range(4)]))
+        else:
+            tiles.append(("", x, y, False, 100, chemins[i % nb_images]))
+    nom_fichier = os.path.join(dossier, "map.bin")
+    SaveBinaire.ecrire(nom_fichier, {"chemin_dossier": dossier, "background": "black", "tiles": tiles, "spawn_points": [], "event_points": []})
+    return nom_fichier
+
+def mesurer(fonction, repetitions=1, preparation=None) -> dict:
+    """
+    retourne le meilleur temps de fonction() sur repetitions exécutions, et le pic de mémoire python d'une exécution de plus
+    preparation() est exécutée (sans être mesurée) avant chaque exécution
+    """
+    meilleur = None
+    for i in range(repetitions):
+        if preparation != None:
+            preparation()
+        gc.collect()
+        debut = time.perf_counter()
+        fonction()
+        duree = time.perf_counter() - debut
+        if meilleur == None or duree < meilleur:
+            meilleur = duree
+    if preparation != None:
+        preparation()
+    gc.collect()
+    tracemalloc.start()
+    fonction()
+    pic = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"secondes": meilleur, "pic_octets": pic}
+
+def bench_taille(nb_tiles:int, proportion_animee:float, etalement:int, repetitions:int, nb_images_render:int) -> dict:
+    resultats = {}
+    with tempfile.TemporaryDirectory() as dossier:
+        nom_binaire = generer_map(dossier, nb_tiles, proportion_animee, etalement)
+        nom_texte = os.path.join(dossier, "map.txt")
+        Map(DIMENSIONS).charger_map(nom_binaire)    # premier chargement : imports, images en cache, etc. ne sont pas comptés
+
+        resultats["charger_binaire"] = mesurer(lambda: Map(DIMENSIONS).charger_map(nom_binaire), repetitions)
+        gc.collect()
+        tracemalloc.start()
+        carte = Map(DIMENSIONS)
+        carte.charger_map(nom_binaire)
+        gc.collect()
+        resultats["octets_par_tile"] = tracemalloc.get_traced_memory()[0] // nb_tiles
+        tracemalloc.stop()
+
+        resultats["save_texte"] = mesurer(lambda: carte._Map__save(nom_texte), repetitions)
+        resultats["charger_texte"] = mesurer(lambda: Map(DIMENSIONS).charger_map(nom_texte), repetitions)
+
+        screen = pygame.surface.Surface(DIMENSIONS)
+        carte.set_animation_auto(True)
+        carte.render(screen)  # création des chunks du champs
+        def render_fixe():
+            for i in range(nb_images_render):
+                carte.render(screen)
+        position = [0]
+        def render_defilement():
+            for i in range(nb_images_render):
+                position[0] = position[0] + 3
+                carte.set_camera_pos((position[0], 0))
+                carte.render(screen)
+        resultats["render_fixe"] = mesurer(render_fixe, repetitions)
+        resultats["render_defilement"] = mesurer(render_defilement, repetitions)
+        # mêmes mesures avec les modes de rendu optimisés (le premier render() de chaque mesure redessine tout)
+        carte.set_camera_pos((0, 0))
+        carte.set_rendu_partiel(True)
+        carte.render(screen)
+        resultats["render_fixe_partiel"] = mesurer(render_fixe, repetitions)
+        carte.set_rendu_partiel(False)
+        carte.set_defilement(True)
+        carte.render(screen)
+        resultats["render_defilement_couche"] = mesurer(render_defilement, repetitions)
+        carte.set_defilement(False)
+        for nom in ("render_fixe", "render_defilement", "render_fixe_partiel", "render_defilement_couche"):
+            resultats[nom]["secondes"] = resultats[nom]["secondes"] / nb_images_render
+
+        def maj_map_image():
+            carte.maj_map_image()
+            carte.render(screen)
+        resultats["maj_map_image"] = mesurer(maj_map_image, repetitions)
+    return resultats
+
+def comparer(resultats:dict, reference:dict, seuil:float) -> bool:
+    """
+    affiche l'évolution de chaque temps par rapport à la référence, retourne True si un temps est plus lent de plus de seuil (0.1 : 10 %)
+    """
+    plus_lent = False
+    for taille, mesures in resultats["tailles"].items():
+        mesures_reference = reference["tailles"].get(taille)
+        if mesures_reference == None:
+            continue
+        for nom, mesure in mesures.items():
+            if type(mesure) != dict or not nom in mesures_reference:
+                continue
+            avant = mesures_reference[nom]["secondes"]
+            apres = mesure["secondes"]
+            evolution = (apres - avant) / avant if avant > 0 else 0
+            alerte = ""
+            if evolution > seuil:
+                alerte = "  PLUS LENT"
+                plus_lent = True
+            print(taille.rjust(8), nom.ljust(24), format(avant, ".6f"), "->", format(apres, ".6f"), format(evolution * 100, "+.1f") + " %" + alerte)
+    return plus_lent
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmarks du moteur de map (sans fenêtre)")
+    parser.add_argument("--tailles", type=int, nargs="+", default=[1000, 10000, 100000], help="nombres de tiles des maps générées")
+    parser.add_argument("--animees", type=float, default=0.05, help="proportion des tiles animées (entre 0 et 1)")
+    parser.add_argument("--etalement", type=int, default=1, help="distance entre deux tiles, en nombre de tiles")
+    parser.add_argument("--repetitions", type=int, default=3, help="nombre d'exécutions de chaque mesure (le meilleur temps est gardé)")
+    parser.add_argument("--images", type=int, default=30, help="nombre de render() par mesure de render")
+    parser.add_argument("--json", help="fichier où écrire les résultats")
+    parser.add_argument("--reference", help="fichier json d'une exécution précédente à comparer")
+    parser.add_argument("--seuil", type=float, default=0.1, help="ralentissement toléré par rapport à la référence (0.1 : 10 %%)")
+    arguments = parser.parse_args()
+
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    resultats = {"infos": {"python": platform.python_version(), "pygame": pygame.version.ver, "animees": arguments.animees,
+                           "etalement": arguments.etalement, "repetitions": arguments.repetitions, "images": arguments.images},
+                 "tailles": {}}
+    for nb_tiles in arguments.tailles:
+        mesures = bench_taille(nb_tiles, arguments.animees, arguments.etalement, arguments.repetitions, arguments.images)
+        resultats["tailles"][str(nb_tiles)] = mesures
+        print("tiles :", nb_tiles, "(octets par tile : " + str(mesures["octets_par_tile"]) + ")")
+        for nom, mesure in mesures.items():
+            if type(mesure) == dict:
+                print("   ", nom.ljust(24), format(mesure["secondes"] * 1000, ".3f").rjust(10), "ms", str(mesure["pic_octets"] // 1024).rjust(10), "Ko (pic)")
+
+    if arguments.json != None:
+        with open(arguments.json, "w") as fichier:
+            json.dump(resultats, fichier, indent=2)
+    if arguments.reference != None:
+        with open(arguments.reference) as fichier:
+            reference = json.load(fichier)
+        print("comparaison avec", arguments.reference)
+        if comparer(resultats, reference, arguments.seuil):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()